@@ -41,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'chores.middleware.StatementTimeoutMiddleware',
+    'chores.middleware.MetricsMiddleware',
+    'chores.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +68,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'chores.context_processors.fragment_cache',
             ],
         },
     },
@@ -75,13 +79,69 @@ WSGI_APPLICATION = 'ChoreTracker.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
+#
+# SQLite by default. Set CHORES_DB_ENGINE=postgresql for the PostgreSQL profile,
+# configured from POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST
+# and POSTGRES_PORT, plus POSTGRES_REPLICA_HOST to read from a replica. The
+# tests run against a local server the same way:
+#
+#   CHORES_DB_ENGINE=postgresql POSTGRES_USER=postgres python manage.py test
+
+def postgres_database(host, test_name=None):
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'chores'),
+        'USER': os.environ.get('POSTGRES_USER', 'chores'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': host,
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # Seconds a connection is kept open for later requests instead of reconnecting every time
+        'CONN_MAX_AGE': int(os.environ.get('CHORES_DB_CONN_MAX_AGE', 60)),
+        # QuerySet.iterator() (exports, agendas) streams rows through a server-side cursor;
+        # transaction-pooling pgbouncer cannot keep one open, so set this to 1 behind it
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('CHORES_DB_DISABLE_SERVER_SIDE_CURSORS') == '1',
+        'TEST': {
+            'NAME': test_name,
+        },
+    }
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+if os.environ.get('CHORES_DB_ENGINE') == 'postgresql':
+    POSTGRES_HOST = os.environ.get('POSTGRES_HOST', 'localhost')
+    DATABASES = {
+        'default': postgres_database(POSTGRES_HOST),
+        # Same server as default unless POSTGRES_REPLICA_HOST is set; a test database of its own
+        'replica': postgres_database(os.environ.get('POSTGRES_REPLICA_HOST', POSTGRES_HOST),
+            'test_%s_replica' % os.environ.get('POSTGRES_DB', 'chores')),
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        },
+        # A read replica of default. In development it is the same file; the tests
+        # give it a file of its own so they can tell which database a page read
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+            'TEST': {
+                'NAME': os.path.join(BASE_DIR, 'test_replica.sqlite3'),
+            },
+        },
+    }
+
+DATABASE_ROUTERS = ['chores.routers.ReplicaRouter']
+
+# Milliseconds after which PostgreSQL cancels a statement run for a web request (0 turns this
+# off). Set per connection by StatementTimeoutMiddleware, so migrations and management commands
+# such as rebuild_points run without it
+CHORES_STATEMENT_TIMEOUT = int(os.environ.get('CHORES_DB_STATEMENT_TIMEOUT', 5000))
+
+# Aliases the list, detail and agenda pages read from (empty: everything reads default)
+CHORES_REPLICAS = ['replica'] if os.environ.get('POSTGRES_REPLICA_HOST') else []
+
+# Seconds after a write during which the client reads from default, so it sees its own changes
+CHORES_REPLICA_PIN_SECONDS = 5
 
 
 # Password validation
@@ -121,3 +181,53 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/1.11/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# List pagination (rows per page, and the most a client may ask for with ?per_page=)
+
+CHORES_PAGE_SIZE = 25
+
+CHORES_MAX_PAGE_SIZE = 100
+
+# Most matches the child and task searches of the chore form return
+CHORES_AUTOCOMPLETE_LIMIT = 10
+
+# Children listed on each leaderboard
+CHORES_LEADERBOARD_SIZE = 10
+
+# Recent chores listed on a child's page
+CHORES_RECENT_CHORES = 10
+
+# Children listed as doing a task most on its page
+CHORES_TASK_TOP_CHILDREN = 5
+
+# Chores deleted per transaction when a child or task is deleted
+CHORES_DELETE_BATCH_SIZE = 1000
+
+# Children shown under each day of the agenda, and chores under each child; the rest are counted
+CHORES_AGENDA_CHILDREN_PER_DAY = 20
+CHORES_AGENDA_CHORES_PER_CHILD = 10
+
+# Days ahead that `manage.py materialize_chores` creates the chores of recurring schedules for
+CHORES_RECURRENCE_DAYS = 28
+
+
+# Cache
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+# The list pages cache their rendered rows; invalidation goes through version
+# counters in this cache, so every process must share it in production
+# (e.g. memcached) rather than use the per-process local memory default.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a rendered list fragment stays cached (writes invalidate it sooner)
+CHORES_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+
+# Request metrics (see /chores/_metrics): recent requests kept per view for percentiles
+
+CHORES_METRICS_WINDOW = 1024
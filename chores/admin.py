@@ -5,3 +5,4 @@ from chores.models import *
 # Register your models here.
 admin.site.register(Child)
 admin.site.register(Task)
+admin.site.register(RecurringChore)
@@ -0,0 +1,114 @@
+import datetime
+
+from django.conf import settings
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+# Week and month agendas
+#
+# An Agenda lists every day of a week (Monday to Sunday) or a calendar month,
+# and under each day the children with chores due then, each with their
+# chores. The rows come from one range query on due_on, joined to the child
+# and task and already sorted in display order, and are grouped in a single
+# pass. They are read as plain values rather than model instances, streamed
+# with iterator() (a server-side cursor on PostgreSQL), and only when the
+# template first asks for them, so a cached page costs no query. Only the
+# first CHORES_AGENDA_CHILDREN_PER_DAY children of a day and the first
+# CHORES_AGENDA_CHORES_PER_CHILD chores of a child are kept and rendered; the
+# rest are only counted, so a busy month stays a page of bounded size. Links
+# are built from URL prefixes reversed once per page rather than per row.
+
+SPANS = ('week', 'month')
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def span_range(span, day):
+    """The first and last day of the week or month containing day."""
+    if span == 'month':
+        start = day.replace(day=1)
+        end = (start + datetime.timedelta(days=31)).replace(day=1) - ONE_DAY
+    else:
+        start = day - datetime.timedelta(days=day.weekday())
+        end = start + datetime.timedelta(days=6)
+    return start, end
+
+
+def url_prefix(name):
+    """The URL of a pattern ending in a numeric id, without the id: the prefix to append ids to."""
+    return reverse(name, args=(0,))[:-1]
+
+
+class AgendaDay(object):
+    def __init__(self, date):
+        self.date = date
+        self.children = []
+        self.more_children = 0
+
+
+class AgendaChild(object):
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.chores = []
+        self.more_chores = 0
+
+
+class Agenda(object):
+    COLUMNS = {
+        'first_name': F('child__first_name'),
+        'last_name': F('child__last_name'),
+        'points': F('task__points'),
+    }
+
+    def __init__(self, queryset, span, day=None, children_per_day=None, chores_per_child=None):
+        self.queryset = queryset
+        self.span = span
+        self.start, self.end = span_range(span, day or timezone.localdate())
+        self.children_per_day = children_per_day or getattr(settings, 'CHORES_AGENDA_CHILDREN_PER_DAY', 20)
+        self.chores_per_child = chores_per_child or getattr(settings, 'CHORES_AGENDA_CHORES_PER_CHILD', 10)
+        self.child_url = url_prefix('chores:child_detail')
+        self.chore_url = url_prefix('chores:chore_detail')
+
+    @property
+    def previous_start(self):
+        return span_range(self.span, self.start - ONE_DAY)[0]
+
+    @property
+    def next_start(self):
+        return self.end + ONE_DAY
+
+    def rows(self):
+        return (self.queryset.due_between(self.start, self.end)
+            .order_by('due_on', 'child__last_name', 'child__first_name', 'child_id', 'task_name', 'id')
+            .values('id', 'due_on', 'completed', 'child_id', 'task_name', **self.COLUMNS)
+            .iterator())
+
+    @property
+    def days(self):
+        if not hasattr(self, '_days'):
+            self._days = self.group(self.rows())
+        return self._days
+
+    # Every day of the range in order, each holding its first children and their first chores
+    def group(self, rows):
+        days, date = [], self.start
+        while date <= self.end:
+            days.append(AgendaDay(date))
+            date += ONE_DAY
+        day = child = None
+        for row in rows:
+            if day is None or row['due_on'] != day.date:
+                day, child = days[(row['due_on'] - self.start).days], None
+            if child is None or row['child_id'] != child.id:
+                child = AgendaChild(row['child_id'], row['first_name'] + " " + row['last_name'])
+                if len(day.children) < self.children_per_day:
+                    day.children.append(child)
+                else:
+                    day.more_children += 1
+            if len(child.chores) < self.chores_per_child:
+                child.chores.append(row)
+            else:
+                child.more_chores += 1
+        return days
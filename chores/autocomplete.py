@@ -0,0 +1,24 @@
+from collections import Counter
+
+from django.conf import settings
+from django.http import JsonResponse
+
+# Autocomplete
+#
+# The chore form picks its child and task through small JSON searches instead
+# of a <select> of every row. search_response() answers one search: it reads
+# the typed prefix from ?q=, runs the model's indexed search() and returns at
+# most CHORES_AUTOCOMPLETE_LIMIT matches as {"results": [{"id", "text"}, ...]}.
+# The widget finds the id of the option picked by its text, so matches sharing
+# a name (two children called "Alex Heimann") are told apart by their id.
+
+def search_response(request, queryset, fields, label):
+    prefix = request.GET.get('q', '').strip()[:255]
+    limit = getattr(settings, 'CHORES_AUTOCOMPLETE_LIMIT', 10)
+    rows = queryset.search(prefix).values_list('id', *fields)[:limit]
+    results = [{'id': row[0], 'text': label(*row[1:])} for row in rows]
+    shared = Counter(result['text'] for result in results)
+    for result in results:
+        if shared[result['text']] > 1:
+            result['text'] = "%s (#%d)" % (result['text'], result['id'])
+    return JsonResponse({'results': results})
@@ -0,0 +1,57 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from chores.routers import reading_replica
+
+# Version counters for cached fragments
+#
+# Every cached list fragment includes in its key the version counters of the
+# models it shows. Writes bump the counters of the models they touch, so the
+# next read builds a new key and the old fragments simply age out. Counters
+# start from the current time in milliseconds, so a counter that was evicted
+# and recreated can never reuse the number of an older fragment.
+
+def _key(name):
+    return "chores:version:%s" % name
+
+
+def _initial():
+    return int(time.time() * 1000)
+
+
+def versions(*names):
+    """Returns a string combining the current versions of the named models, e.g. "chore.12-task.9"."""
+    keys = [_key(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _initial(), None)
+            found[key] = cache.get(key)
+    return "-".join("%s.%s" % (name, found[key]) for name, key in zip(names, keys))
+
+
+def fill(key, value, timeout=None):
+    """Caches a value computed on a cache miss, unless it was read from a replica that may lag the versions."""
+    if not reading_replica():
+        cache.set(key, value, timeout)
+
+
+def _incr(names):
+    for name in names:
+        try:
+            cache.incr(_key(name))
+        except ValueError:
+            cache.add(_key(name), _initial(), None)
+
+
+def bump(*names):
+    """Invalidates the fragments built from the named models.
+
+    The counters move immediately, and once more when the surrounding
+    transaction commits, so a reader that rendered uncommitted-era data in
+    between cannot leave a stale fragment behind.
+    """
+    _incr(names)
+    transaction.on_commit(lambda: _incr(names))
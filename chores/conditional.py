@@ -0,0 +1,80 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from chores import caching
+
+# Conditional GET (ETag / Last-Modified) for the list and detail views
+#
+# A view describes the state of the data it shows with a "state function":
+# the newest updated_at and the row count of each table a list shows, or the
+# updated_at of each row a detail page shows. Those come from aggregate or
+# single-row queries, so a client revalidating an unchanged page gets a 304
+# without any rows being loaded or any template being rendered.
+#
+# Last-Modified is only sent for a state made up solely of row timestamps
+# (row_state): those move with every change to the page. Counts, version
+# strings and dates change without any updated_at moving (a row is deleted,
+# a version is bumped, a day passes), so pages with those in their state are
+# revalidated by ETag alone, never by If-Modified-Since.
+
+def table_state(*querysets):
+    """The (newest updated_at, row count) of each queryset, one aggregate query apiece."""
+    state = []
+    for queryset in querysets:
+        result = queryset.order_by().aggregate(latest=Max('updated_at'), count=Count('pk'))
+        state.extend([result['latest'], result['count']])
+    return state
+
+
+def cached_table_state(name, models, *querysets):
+    """table_state(), remembered in the cache until the version of one of the named models moves."""
+    key = 'chores:state:%s:%s' % (name, caching.versions(*models))
+    state = cache.get(key)
+    if state is None:
+        state = table_state(*querysets)
+        caching.fill(key, state)
+    return state
+
+
+def row_state(queryset, *fields):
+    """The given timestamp fields of the single row in queryset, or None if there is no such row."""
+    return queryset.values_list(*fields).first()
+
+
+def conditional(state_func):
+    """Decorates a View's get(request, ...) to answer conditional requests from state_func(request, ...)."""
+    def decorator(get):
+        @wraps(get)
+        def wrapper(self, request, *args, **kwargs):
+            # Pending flash messages must be shown, so never let the client reuse its copy
+            if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+                return get(self, request, *args, **kwargs)
+            state = state_func(request, *args, **kwargs)
+            if state is None:
+                return get(self, request, *args, **kwargs)
+
+            last_modified = None
+            if state and all(hasattr(value, 'utctimetuple') for value in state):
+                last_modified = timegm(max(state).utctimetuple())
+            etag = quote_etag(hashlib.md5(repr(tuple(state)).encode('utf-8')).hexdigest())
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = get(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            if last_modified and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(last_modified)
+            if not response.has_header('ETag'):
+                response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
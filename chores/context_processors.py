@@ -0,0 +1,10 @@
+from django.conf import settings
+
+from chores.routers import reading_replica
+
+
+# A timeout of 0 expires a fragment as soon as it is stored, so replica reads never fill the cache
+def fragment_cache(request):
+    return {
+        'fragment_cache_timeout': 0 if reading_replica() else getattr(settings, 'CHORES_FRAGMENT_CACHE_TIMEOUT', 3600),
+    }
@@ -0,0 +1,32 @@
+import logging
+
+from django.conf import settings
+
+# Batched deletes
+#
+# Deleting a child or task cascades to all of its chores. As one statement
+# that holds locks on the chores table for as long as the whole cascade takes,
+# so the chores are deleted first, CHORES_DELETE_BATCH_SIZE at a time, each
+# batch in its own transaction through the model's QuerySet.delete() (which
+# keeps the points ledger and cache versions right). Only primary keys are
+# read, one batch at a time, so memory stays flat however many rows go.
+# Progress is logged to the "chores.deletion" logger for deletes that take
+# more than one batch. Keyword arguments go on to each batch's delete(), so
+# a child's delete can tell the batches not to refresh the ledger of the very
+# child being deleted, which would re-add its remaining chores every batch.
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset, batch_size=None, **options):
+    """Deletes the rows of queryset a batch per transaction and returns how many were deleted."""
+    batch_size = batch_size or getattr(settings, 'CHORES_DELETE_BATCH_SIZE', 1000)
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += model.objects.filter(pk__in=ids).delete(**options)[0]
+        if len(ids) == batch_size:
+            logger.info("Deleted %d %s so far", deleted, model._meta.verbose_name_plural)
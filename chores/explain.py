@@ -0,0 +1,60 @@
+from django.db import connections
+
+# Query plan helpers
+#
+# explain(queryset) returns the database's plan for a queryset as a list of
+# lines. On SQLite this is EXPLAIN QUERY PLAN, where a line such as
+# "SCAN chores_chore" (with no "USING INDEX") means a full table scan; on
+# PostgreSQL it is EXPLAIN, where the same thing reads "Seq Scan on
+# chores_chore". PostgreSQL prefers sequential scans of small tables whatever
+# the indexes, so check plans there after disable_seq_scans().
+
+def explain(queryset):
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN " + sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_table_scans(plan, table):
+    """Returns the plan lines that read every row of table without an index."""
+    scans = []
+    for line in plan:
+        words = line.split()
+        if table not in words:
+            continue
+        if words[:1] == ["SCAN"] and "INDEX" not in words:
+            scans.append(line)
+        elif "Seq Scan on " + table in line:
+            scans.append(line)
+    return scans
+
+
+def index_seeks(plan, index):
+    """Returns the plan lines that read only a range of index rather than all of it."""
+    seeks = []
+    for i, line in enumerate(plan):
+        if index not in line.split():
+            continue
+        if line.split()[:1] == ["SEARCH"]:
+            seeks.append(line)
+        elif any("Index Cond:" in detail for detail in plan[i + 1:i + 3]):
+            seeks.append(line)
+    return seeks
+
+
+def sorts(plan):
+    """Returns the plan lines that sort rows instead of reading them in index order."""
+    return [line for line in plan if "TEMP B-TREE" in line or line.strip().lstrip("->").split()[:1] == ["Sort"]]
+
+
+def disable_seq_scans(using="default"):
+    """Makes PostgreSQL plan with indexes wherever it can, until the current transaction or savepoint ends."""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
@@ -0,0 +1,56 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Streaming chore export
+#
+# rows() reads the chores through a database iterator (a server-side cursor on
+# PostgreSQL), so only a chunk of rows is in memory at a time, and the encoders
+# turn them into text chunks for a StreamingHttpResponse.
+
+COLUMNS = ("id", "child", "task", "points", "due_on", "completed")
+
+CHUNK_ROWS = 500
+
+
+def rows(queryset):
+    values = queryset.order_by("due_on", "id").values_list(
+        "id", "child__first_name", "child__last_name", "task__name", "task__points", "due_on", "completed")
+    for pk, first_name, last_name, task, points, due_on, completed in values.iterator():
+        yield (pk, first_name + " " + last_name, task, points, due_on, completed)
+
+
+class Echo(object):
+    """A file-like object whose write() just returns what it was given, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def to_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for chunk in _chunked(writer.writerow(row) for row in rows):
+        yield chunk
+
+
+def to_ndjson(rows):
+    encoder = DjangoJSONEncoder()
+    return _chunked(encoder.encode(dict(zip(COLUMNS, row))) + "\n" for row in rows)
+
+
+FORMATS = {
+    "csv": (to_csv, "text/csv"),
+    "ndjson": (to_ndjson, "application/x-ndjson"),
+}
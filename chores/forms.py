@@ -1,5 +1,10 @@
+import datetime
+
 from django import forms
+from django.db import transaction
 from chores.models import *
+from chores.widgets import AutocompleteInput, AutocompleteMultipleInput
+from chores.agenda import SPANS
 
 class ChildForm(forms.ModelForm):
 
@@ -19,6 +24,119 @@ class ChoreForm(forms.ModelForm):
     class Meta:
         model = Chore
         fields = ["child", "task", "due_on", "completed"] 
+        # Searched as you type rather than listing every child and task in the page
         widgets = {
+            'child': AutocompleteInput('chores:child_search'),
+            'task': AutocompleteInput('chores:task_search'),
             'due_on': forms.SelectDateWidget(),
         }
+
+
+class ChoreBulkForm(forms.Form):
+    # The active children and tasks the search endpoints offer, for every child x task x day in the range
+    children = forms.ModelMultipleChoiceField(queryset=Child.objects.active().alphabetical(),
+        widget=AutocompleteMultipleInput('chores:child_search'))
+    tasks = forms.ModelMultipleChoiceField(queryset=Task.objects.active().alphabetical(),
+        widget=AutocompleteMultipleInput('chores:task_search'))
+    start_on = forms.DateField(widget=forms.SelectDateWidget())
+    end_on = forms.DateField(widget=forms.SelectDateWidget())
+    completed = forms.BooleanField(required=False)
+
+    max_days = 366
+    max_chores = 20000
+    batch_size = 500
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_on, end_on = cleaned_data.get('start_on'), cleaned_data.get('end_on')
+        if start_on and end_on:
+            if end_on < start_on:
+                raise forms.ValidationError("The end date must not be before the start date.")
+            days = (end_on - start_on).days + 1
+            if days > self.max_days:
+                raise forms.ValidationError("Chores can be scheduled at most %d days at a time." % self.max_days)
+            if 'children' in cleaned_data and 'tasks' in cleaned_data:
+                total = days * len(cleaned_data['children']) * len(cleaned_data['tasks'])
+                if total > self.max_chores:
+                    raise forms.ValidationError("That would create %d chores; the limit is %d." % (total, self.max_chores))
+        return cleaned_data
+
+    def days(self):
+        day = self.cleaned_data['start_on']
+        while day <= self.cleaned_data['end_on']:
+            yield day
+            day += datetime.timedelta(days=1)
+
+    # Creates the batch in one transaction, skipping chores that already exist.
+    # Returns (number created, number skipped).
+    def save(self):
+        children, tasks = self.cleaned_data['children'], self.cleaned_data['tasks']
+        with transaction.atomic():
+            existing = set(Chore.objects.filter(child__in=children, task__in=tasks,
+                due_on__range=(self.cleaned_data['start_on'], self.cleaned_data['end_on']))
+                .values_list('child_id', 'task_id', 'due_on'))
+            chores = [Chore(child=child, task=task, due_on=day, completed=self.cleaned_data['completed'])
+                for day in self.days() for child in children for task in tasks
+                if (child.id, task.id, day) not in existing]
+            Chore.objects.bulk_create(chores, batch_size=self.batch_size)
+        return len(chores), len(existing)
+
+
+class ChoreBulkActionForm(forms.Form):
+    ACTIONS = (
+        ('complete', 'Mark completed'),
+        ('pending', 'Mark pending'),
+    )
+
+    chores = forms.ModelMultipleChoiceField(queryset=Chore.objects.all())
+    action = forms.ChoiceField(choices=ACTIONS)
+
+    # Applies the action to every selected chore at once.
+    # Returns (number changed, number selected).
+    def save(self):
+        chores = self.cleaned_data['chores']
+        return chores.set_completed(self.cleaned_data['action'] == 'complete'), len(chores)
+
+
+class ChoreExportForm(forms.Form):
+    STATUSES = (
+        ('', 'All'),
+        ('done', 'Completed'),
+        ('pending', 'Pending'),
+    )
+    FORMATS = (
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    )
+
+    child = forms.ModelChoiceField(queryset=Child.objects.all(), required=False)
+    task = forms.ModelChoiceField(queryset=Task.objects.all(), required=False)
+    status = forms.ChoiceField(choices=STATUSES, required=False)
+    start_on = forms.DateField(required=False)
+    end_on = forms.DateField(required=False)
+    format = forms.ChoiceField(choices=FORMATS, required=False)
+
+    # The chores matching the submitted filters
+    def queryset(self):
+        chores = Chore.objects.all()
+        data = self.cleaned_data
+        if data['child']:
+            chores = chores.filter(child=data['child'])
+        if data['task']:
+            chores = chores.filter(task=data['task'])
+        if data['status']:
+            chores = getattr(chores, data['status'])()
+        if data['start_on']:
+            chores = chores.filter(due_on__gte=data['start_on'])
+        if data['end_on']:
+            chores = chores.filter(due_on__lte=data['end_on'])
+        return chores
+
+
+class ChoreImportForm(forms.Form):
+    file = forms.FileField(label="CSV file")
+
+
+class ChoreAgendaForm(forms.Form):
+    span = forms.ChoiceField(choices=[(span, span.title()) for span in SPANS], required=False)
+    start = forms.DateField(required=False)
@@ -0,0 +1,161 @@
+import csv
+import operator
+from collections import defaultdict
+from functools import reduce
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from chores.forms import ChoreForm
+from chores.models import Child, Chore, Task
+
+# Streaming chore import
+#
+# read() parses a CSV of child, task, due_on and completed (the columns of
+# chores.export, so an export can be imported again; other columns are
+# ignored) row by row, and handles batch_rows rows at a time: each batch is
+# validated with the rules of ChoreForm's fields, checked against the chores
+# that already exist with one query, and written with one bulk insert in its
+# own transaction. Children and tasks are named by id or by name ("First
+# Last" for children), resolved through an id set and a name map loaded once
+# before the first row, so memory depends on the number of children and tasks
+# and the batch size, never on the size of the file. A reference made only of
+# digits is an id when there is a row with that id, and a name otherwise. Rows with errors are skipped and
+# reported by line number, keeping at most max_errors messages.
+
+REQUIRED_COLUMNS = ("child", "task", "due_on")
+
+BATCH_ROWS = 500
+
+MAX_ERRORS = 100
+
+MAX_PARAMETERS = 900
+
+
+class InvalidFile(ValueError):
+    pass
+
+
+class ImportResult(object):
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, message, max_errors):
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append((line, message))
+
+
+def _lookup(rows):
+    """({ids}, {name: id}) from (id, name) rows, with names shared by several rows mapped to None."""
+    ids, names = set(), {}
+    for pk, name in rows:
+        ids.add(pk)
+        names[name] = None if name in names else pk
+    return ids, names
+
+
+def lookups():
+    children = Child.objects.order_by().values_list('id', 'first_name', 'last_name').iterator()
+    tasks = Task.objects.order_by().values_list('id', 'name').iterator()
+    return (_lookup((pk, first_name + " " + last_name) for pk, first_name, last_name in children),
+        _lookup(tasks))
+
+
+def _resolve(lookup, field, reference):
+    ids, names = lookup
+    reference = reference.strip()
+    if not reference:
+        raise ValidationError(field.error_messages['required'])
+    if reference.isdigit() and int(reference) in ids:
+        return int(reference)
+    if reference not in names:
+        raise ValidationError(field.error_messages['invalid_choice'])
+    if names[reference] is None:
+        raise ValidationError("More than one matches %r; use the id instead." % reference)
+    return names[reference]
+
+
+def _validate(batch, children, tasks, result, max_errors):
+    """The (line, child id, task id, due_on, completed) of the valid rows of a batch."""
+    fields = ChoreForm.base_fields
+    cleaners = (
+        ('child', lambda value: _resolve(children, fields['child'], value)),
+        ('task', lambda value: _resolve(tasks, fields['task'], value)),
+        ('due_on', lambda value: fields['due_on'].clean(value.strip())),
+        ('completed', lambda value: fields['completed'].clean(value.strip())),
+    )
+    valid = []
+    for line, row in batch:
+        values, errors = [line], []
+        for column, clean in cleaners:
+            try:
+                values.append(clean(row.get(column) or ''))
+            except ValidationError as error:
+                errors.append("%s: %s" % (column, " ".join(error.messages)))
+        if errors:
+            result.error(line, "; ".join(errors), max_errors)
+        else:
+            valid.append(tuple(values))
+    return valid
+
+
+def _existing(keys):
+    """The (child id, task id, due_on) keys that already have a chore."""
+    days = defaultdict(set)
+    for child_id, task_id, due_on in keys:
+        days[child_id].add(due_on)
+    children, existing = sorted(days), set()
+    # One index range in chore_child_due_on_idx per child; chunks keep within SQLite's 999 parameters
+    start = 0
+    while start < len(children):
+        end, parameters = start, 0
+        while end < len(children) and parameters + 1 + len(days[children[end]]) <= MAX_PARAMETERS:
+            parameters += 1 + len(days[children[end]])
+            end += 1
+        end = max(end, start + 1)
+        match = reduce(operator.or_, (Q(child_id=child_id, due_on__in=days[child_id]) for child_id in children[start:end]))
+        existing.update(key for key in Chore.objects.filter(match).values_list('child_id', 'task_id', 'due_on') if key in keys)
+        start = end
+    return existing
+
+
+def _save(valid, result):
+    if not valid:
+        return
+    with transaction.atomic():
+        seen = _existing({(child_id, task_id, due_on) for line, child_id, task_id, due_on, completed in valid})
+        chores = []
+        for line, child_id, task_id, due_on, completed in valid:
+            if (child_id, task_id, due_on) in seen:
+                result.skipped += 1
+                continue
+            seen.add((child_id, task_id, due_on))
+            chores.append(Chore(child_id=child_id, task_id=task_id, due_on=due_on, completed=completed))
+        Chore.objects.bulk_create(chores)
+    result.created += len(chores)
+
+
+def read(lines, batch_rows=BATCH_ROWS, max_errors=MAX_ERRORS):
+    """Imports the chores of a CSV file (an iterable of text lines) and returns an ImportResult.
+
+    Chores that already exist (the same child, task and due date) are skipped.
+    """
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise InvalidFile("The file has no %s column." % ", ".join(missing))
+    children, tasks = lookups()
+    result = ImportResult()
+    # line_num counts the header too, so it is the row's line number in the file
+    rows = ((reader.line_num, row) for row in reader)
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            return result
+        _save(_validate(batch, children, tasks, result, max_errors), result)
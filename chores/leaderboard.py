@@ -0,0 +1,107 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from chores import caching
+from chores.agenda import span_range
+from chores.models import Child, Chore
+
+# Leaderboards
+#
+# The all-time board ranks active children by their points ledger, read in
+# order from child_points_idx. The weekly and monthly boards sum the points of
+# the chores completed with a due date in the current week or month, one
+# aggregate query over chore_completed_due_on_idx. Children with equal points
+# share a rank (1, 2, 2, 4), which is found from a cached histogram of how
+# many children have each number of points, so after one aggregate per board
+# every child's rank costs a single small query for its own points. Boards,
+# histograms and ranks are cached under the "points"
+# version, which every ledger change bumps (including a completed chore moving
+# to another day), and the "child" version, which covers renames and children
+# leaving or joining.
+
+PERIODS = (
+    ('week', 'This week'),
+    ('month', 'This month'),
+    ('all', 'All time'),
+)
+
+
+def _key(name, period, start, *parts):
+    return 'chores:leaderboard:%s:%s:%s:%s:%s' % (
+        name, period, start, ':'.join(str(part) for part in parts), caching.versions('points', 'child'))
+
+
+def period_start(period):
+    """The first day of the current week or month, or None for all time."""
+    if period == 'all':
+        return None
+    return span_range(period, timezone.localdate())[0]
+
+
+def _totals(period, start):
+    """The active children's points in the period, and the fields giving each one's (id, first name, last name, points)."""
+    if start is None:
+        return Child.objects.active(), ('id', 'first_name', 'last_name', 'points')
+    end = span_range(period, start)[1]
+    chores = (Chore.objects.filter(completed=True, due_on__range=(start, end), child__active=True)
+        .values('child_id').annotate(points=Sum('task__points')))
+    return chores, ('child_id', 'child__first_name', 'child__last_name', 'points')
+
+
+def top(period, limit=None):
+    """The highest ranked children of the period, as dicts of rank, id, name and points."""
+    limit = limit or getattr(settings, 'CHORES_LEADERBOARD_SIZE', 10)
+    start = period_start(period)
+    key = _key('top', period, start, limit)
+    board = cache.get(key)
+    if board is None:
+        totals, fields = _totals(period, start)
+        board, rank = [], 0
+        rows = totals.order_by('-points', fields[0]).values_list(*fields)[:limit]
+        for position, (id, first_name, last_name, points) in enumerate(rows, 1):
+            if not board or points != board[-1]['points']:
+                rank = position
+            board.append({'rank': rank, 'id': id, 'name': first_name + " " + last_name, 'points': points})
+        caching.fill(key, board)
+    return board
+
+
+def _histogram(period, start):
+    """{points: number of active children with that many points} for the period."""
+    key = _key('histogram', period, start)
+    histogram = cache.get(key)
+    if histogram is None:
+        totals, fields = _totals(period, start)
+        if start is None:
+            histogram = dict(totals.order_by().values_list('points').annotate(children=Count('id')))
+        else:
+            histogram = dict(Counter(totals.order_by().values_list('points', flat=True)))
+        caching.fill(key, histogram)
+    return histogram
+
+
+def rank_of(child, period):
+    """(rank, points) of a child in the period: one more than the number of active children ahead of it.
+
+    None for an inactive child, which is not on the boards it would be ranked against.
+    """
+    if not child.active:
+        return None
+    start = period_start(period)
+    key = _key('rank', period, start, child.pk)
+    result = cache.get(key)
+    if result is None:
+        if start is None:
+            points = Child.objects.filter(pk=child.pk).values_list('points', flat=True).get()
+        else:
+            end = span_range(period, start)[1]
+            points = (Chore.objects.filter(child=child, completed=True, due_on__range=(start, end))
+                .aggregate(points=Sum('task__points'))['points'] or 0)
+        ahead = sum(children for total, children in _histogram(period, start).items() if total > points)
+        result = (ahead + 1, points)
+        caching.fill(key, result)
+    return result
@@ -0,0 +1,46 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from chores import leaderboard
+from chores.models import Chore
+
+
+class Command(BaseCommand):
+    help = ("Moves completed chores due before a cutoff into the archive table, a small batch per "
+            "transaction so the live chores table is never locked for long.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True,
+            help="Archive completed chores due more than this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=500,
+            help="Chores moved per transaction (default 500).")
+        parser.add_argument('--pause', type=float, default=0,
+            help="Seconds to sleep between batches, to leave room for other writers (default 0).")
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 0:
+            raise CommandError("--older-than cannot be negative.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        cutoff = timezone.localdate() - datetime.timedelta(days=options['older_than'])
+        # The weekly and monthly leaderboards only sum live chores, so keep the current periods' chores
+        current = min(leaderboard.period_start('week'), leaderboard.period_start('month'))
+        if cutoff > current:
+            self.stderr.write("Keeping the chores of the current week and month: archiving chores due before %s." % current)
+            cutoff = current
+
+        candidates = Chore.objects.filter(completed=True, due_on__lt=cutoff).order_by('due_on', 'id')
+        archived = 0
+        while True:
+            ids = list(candidates.values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            archived += Chore.objects.filter(pk__in=ids).archive()
+            self.stdout.write("Archived %d chores..." % archived)
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS("Archived %d chores due before %s." % (archived, cutoff)))
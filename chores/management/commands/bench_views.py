@@ -0,0 +1,222 @@
+import datetime
+import json
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from chores.models import Child, Chore, Task
+from chores.seeding import seed
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = ("Benchmarks every chores view through the test client against a throwaway database "
+            "at one or more scales, optionally failing on regressions against a saved baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='10,1000',
+            help="Comma separated numbers of chores to benchmark at (default 10,1000).")
+        parser.add_argument('--requests', type=int, default=20,
+            help="Requests per view and scale (default 20).")
+        parser.add_argument('--output',
+            help="Write the results as JSON to this file instead of standard output.")
+        parser.add_argument('--baseline',
+            help="A previous --output file to compare against.")
+        parser.add_argument('--threshold', type=float, default=0.25,
+            help="Fractional p50 latency increase over the baseline counted as a regression (default 0.25).")
+        parser.add_argument('--no-cache', action='store_true',
+            help="Clear the cache before every request to measure cold rendering.")
+        parser.add_argument('--seed', type=int, default=495,
+            help="Random seed for the generated data.")
+
+    def handle(self, *args, **options):
+        scales = [int(scale) for scale in options['scales'].split(',')]
+        random.seed(options['seed'])
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = {
+                'requests': options['requests'],
+                'scales': dict((str(scale), self.bench_scale(scale, options)) for scale in scales),
+            }
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        self.report(results)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                regressions = self.compare(json.load(f), results, options['threshold'])
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError("%d views regressed against %s." % (len(regressions), options['baseline']))
+            self.stdout.write(self.style.SUCCESS("No regressions against %s." % options['baseline']))
+
+    # Data
+
+    def populate(self, chores):
+        Chore.objects.all().delete()
+        Child.objects.all().delete()
+        Task.objects.all().delete()
+        seed(max(1, chores // 50), 10, chores, rng=random)
+        cache.clear()
+        return list(Child.objects.order_by('pk')), list(Task.objects.order_by('pk'))
+
+    # Requests
+
+    def scenarios(self, children, tasks):
+        """(URL name, function making one request with the client) for every view."""
+        child, task = children[0], tasks[0]
+        chore = Chore.objects.order_by('pk').first()
+        today = timezone.localdate()
+        due_on = (today + datetime.timedelta(days=3)).isoformat()
+        chore_data = {'child': child.pk, 'task': task.pk, 'due_on': due_on, 'completed': False}
+        # Bulk creation only accepts active children and tasks
+        bulk_data = {'children': [each.pk for each in children if each.active][:1],
+                     'tasks': [each.pk for each in tasks if each.active][:2], 'completed': False}
+        for field, day in (('start_on', today), ('end_on', today + datetime.timedelta(days=6))):
+            bulk_data.update({field + '_year': day.year, field + '_month': day.month, field + '_day': day.day})
+        bulk_action_data = {'chores': list(Chore.objects.order_by('pk').values_list('pk', flat=True)[:50]),
+                            'action': 'complete'}
+        import_rows = ["child,task,due_on,completed"] + [
+            "%d,%d,%s,false" % (child.pk, task.pk, today + datetime.timedelta(days=day)) for day in range(10, 20)]
+        # Metrics are for staff only
+        staff = Client()
+        staff.force_login(User.objects.get_or_create(username='bench', defaults={'is_staff': True})[0])
+
+        def new_child():
+            return Child.objects.create(first_name="Spare", last_name="Bench")
+
+        def new_task():
+            return Task.objects.create(name="Spare task", points=1)
+
+        def new_chore():
+            return Chore.objects.create(child=child, task=task, due_on=due_on)
+
+        def new_upload():
+            return SimpleUploadedFile('chores.csv', '\n'.join(import_rows).encode('utf-8'), 'text/csv')
+
+        def export(c):
+            response = c.get(reverse('chores:chore_export'))
+            # Streamed, so the rows are only read as the body is consumed
+            b''.join(response.streaming_content)
+            return response
+
+        return [
+            ('chores:child_list', lambda c: c.get(reverse('chores:child_list')), None),
+            ('chores:child_detail', lambda c: c.get(reverse('chores:child_detail', args=(child.pk,))), None),
+            ('chores:child_new', lambda c: c.get(reverse('chores:child_new')), None),
+            ('chores:child_new POST', lambda c: c.post(reverse('chores:child_new'),
+                {'first_name': 'New', 'last_name': 'Bench', 'active': True}), None),
+            ('chores:child_edit', lambda c: c.get(reverse('chores:child_edit', args=(child.pk,))), None),
+            ('chores:child_edit POST', lambda c: c.post(reverse('chores:child_edit', args=(child.pk,)),
+                {'first_name': child.first_name, 'last_name': 'Bench', 'active': True}), None),
+            ('chores:child_delete POST', lambda c, spare: c.post(reverse('chores:child_delete', args=(spare.pk,))), new_child),
+            ('chores:task_list', lambda c: c.get(reverse('chores:task_list')), None),
+            ('chores:task_detail', lambda c: c.get(reverse('chores:task_detail', args=(task.pk,))), None),
+            ('chores:task_new', lambda c: c.get(reverse('chores:task_new')), None),
+            ('chores:task_new POST', lambda c: c.post(reverse('chores:task_new'),
+                {'name': 'New task', 'points': 1, 'active': True}), None),
+            ('chores:task_edit', lambda c: c.get(reverse('chores:task_edit', args=(task.pk,))), None),
+            ('chores:task_edit POST', lambda c: c.post(reverse('chores:task_edit', args=(task.pk,)),
+                {'name': task.name, 'points': task.points, 'active': True}), None),
+            ('chores:task_delete POST', lambda c, spare: c.post(reverse('chores:task_delete', args=(spare.pk,))), new_task),
+            ('chores:chore_list', lambda c: c.get(reverse('chores:chore_list')), None),
+            ('chores:chore_detail', lambda c: c.get(reverse('chores:chore_detail', args=(chore.pk,))), None),
+            ('chores:chore_new', lambda c: c.get(reverse('chores:chore_new')), None),
+            ('chores:chore_new POST', lambda c: c.post(reverse('chores:chore_new'), chore_data), None),
+            ('chores:chore_edit', lambda c: c.get(reverse('chores:chore_edit', args=(chore.pk,))), None),
+            ('chores:chore_edit POST', lambda c: c.post(reverse('chores:chore_edit', args=(chore.pk,)),
+                {'child': chore.child_id, 'task': chore.task_id, 'due_on': chore.due_on.isoformat(),
+                 'completed': chore.completed}), None),
+            ('chores:chore_delete POST', lambda c, spare: c.post(reverse('chores:chore_delete', args=(spare.pk,))), new_chore),
+            ('chores:chore_bulk_new', lambda c: c.get(reverse('chores:chore_bulk_new')), None),
+            ('chores:chore_bulk_new POST', lambda c: c.post(reverse('chores:chore_bulk_new'), bulk_data), None),
+            ('chores:chore_bulk_update POST', lambda c: c.post(reverse('chores:chore_bulk_update'), bulk_action_data), None),
+            ('chores:chore_agenda', lambda c: c.get(reverse('chores:chore_agenda')), None),
+            ('chores:chore_export', export, None),
+            ('chores:chore_import', lambda c: c.get(reverse('chores:chore_import')), None),
+            ('chores:chore_import POST', lambda c, spare: c.post(reverse('chores:chore_import'), {'file': spare}), new_upload),
+            ('chores:archived_chore_list', lambda c: c.get(reverse('chores:archived_chore_list')), None),
+            ('chores:child_leaderboard', lambda c: c.get(reverse('chores:child_leaderboard'), {'child': child.pk}), None),
+            ('chores:child_search', lambda c: c.get(reverse('chores:child_search'), {'q': child.first_name[:2]}), None),
+            ('chores:task_search', lambda c: c.get(reverse('chores:task_search'), {'q': task.name[:2]}), None),
+            ('chores:metrics', lambda c: staff.get(reverse('chores:metrics')), None),
+        ]
+
+    def bench_scale(self, scale, options):
+        self.stderr.write("Benchmarking %d chores..." % scale)
+        children, tasks = self.populate(scale)
+        client = Client()
+        results = {}
+        for name, request, make_spare in self.scenarios(children, tasks):
+            latencies, queries = [], []
+            for i in range(options['requests']):
+                spare = make_spare() if make_spare else None
+                if options['no_cache']:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = request(client, spare) if make_spare else request(client)
+                    latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    raise CommandError("%s returned %d." % (name, response.status_code))
+                queries.append(len(captured))
+            latencies.sort()
+            results[name] = {
+                'rps': len(latencies) / sum(latencies),
+                'p50_ms': percentile(latencies, 0.5) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'queries': sum(queries) / float(len(queries)),
+                'queries_max': max(queries),
+            }
+        return results
+
+    # Reporting
+
+    def report(self, results):
+        for scale, views in sorted(results['scales'].items(), key=lambda item: int(item[0])):
+            self.stderr.write("\n%s chores" % scale)
+            self.stderr.write("%-32s %10s %10s %10s %10s %8s" % ('view', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'queries'))
+            for name, stats in sorted(views.items()):
+                self.stderr.write("%-32s %10.1f %10.2f %10.2f %10.2f %8.1f" % (
+                    name, stats['rps'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms'], stats['queries']))
+
+    def compare(self, baseline, results, threshold):
+        regressions = []
+        for scale, views in sorted(results['scales'].items()):
+            for name, stats in sorted(views.items()):
+                before = baseline.get('scales', {}).get(scale, {}).get(name)
+                if not before:
+                    continue
+                if stats['p50_ms'] > before['p50_ms'] * (1 + threshold):
+                    regressions.append("%s at %s chores: p50 %.2f ms, baseline %.2f ms" % (
+                        name, scale, stats['p50_ms'], before['p50_ms']))
+                # The mean depends on how many requests hit a warm cache, the worst case does not
+                if stats['queries_max'] > before['queries_max']:
+                    regressions.append("%s at %s chores: up to %d queries per request, baseline %d" % (
+                        name, scale, stats['queries_max'], before['queries_max']))
+        return regressions
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from chores import importer
+
+
+class Command(BaseCommand):
+    help = ("Imports chores from a CSV file with child, task, due_on and completed columns, naming children "
+            "and tasks by id or name. Rows with errors are reported and skipped, as are chores that already exist.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('file',
+            help="The CSV file to import.")
+        parser.add_argument('--batch-size', type=int, default=importer.BATCH_ROWS,
+            help="Rows validated and inserted per transaction (default %d)." % importer.BATCH_ROWS)
+        parser.add_argument('--max-errors', type=int, default=importer.MAX_ERRORS,
+            help="Most row errors to list (default %d)." % importer.MAX_ERRORS)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        try:
+            with open(options['file'], encoding='utf-8-sig', newline='') as f:
+                result = importer.read(f, options['batch_size'], options['max_errors'])
+        except (OSError, UnicodeDecodeError, importer.InvalidFile) as error:
+            raise CommandError(str(error))
+
+        for line, message in result.errors:
+            self.stderr.write("Line %d: %s" % (line, message))
+        if result.failed > len(result.errors):
+            self.stderr.write("... and %d more rows with errors." % (result.failed - len(result.errors)))
+        summary = "Imported %d chores (%d already existed, %d rows had errors)." % (
+            result.created, result.skipped, result.failed)
+        self.stdout.write(self.style.SUCCESS(summary) if not result.failed else summary)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chores import recurrence
+
+
+class Command(BaseCommand):
+    help = ("Creates the chores of every active recurring schedule for the days ahead, picking up where "
+            "the previous run left off. Run it daily, e.g. from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+            help="Days ahead of today to create chores through (default CHORES_RECURRENCE_DAYS, 28).")
+        parser.add_argument('--batch-size', type=int, default=recurrence.BATCH_SCHEDULES,
+            help="Schedules materialized per transaction (default %d)." % recurrence.BATCH_SCHEDULES)
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError("--days cannot be negative.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        start = time.perf_counter()
+        result = recurrence.materialize(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS("Created %d chores for %d schedules through %s in %.2f s." % (
+            result.chores, result.schedules, result.through, time.perf_counter() - start)))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from chores.models import Child
+
+
+class Command(BaseCommand):
+    help = "Checks every child's points ledger against its completed chores and repairs any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+            help="Only report drift (exits with an error if any is found) without repairing it.")
+        parser.add_argument('--show', type=int, default=20,
+            help="How many drifted children to list (default 20).")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = Child.objects.with_points().exclude(points=F('total_points')).order_by('pk')
+            count = drifted.count()
+            for child in drifted[:options['show']]:
+                self.stdout.write("%s (id %d): ledger %d, chores %d" % (child, child.pk, child.points, child.total_points))
+
+            if count == 0:
+                self.stdout.write(self.style.SUCCESS("All %d ledgers match their chores." % Child.objects.count()))
+                return
+            if options['check']:
+                raise CommandError("%d children have drifted points ledgers." % count)
+
+            repaired = Child.objects.filter(pk__in=drifted.values('pk')).refresh_points()
+        self.stdout.write(self.style.SUCCESS("Repaired %d drifted ledgers." % repaired))
@@ -0,0 +1,37 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chores.seeding import seed
+
+
+class Command(BaseCommand):
+    help = ("Generates children, tasks and chores with realistic names, points, due dates and completion "
+            "states, written with batched bulk inserts in a single transaction.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--children', type=int, default=100,
+            help="Children to create (default 100).")
+        parser.add_argument('--tasks', type=int, default=16,
+            help="Tasks to create (default 16).")
+        parser.add_argument('--chores', type=int, default=10000,
+            help="Chores to create, spread over the new children and tasks (default 10000).")
+        parser.add_argument('--batch-size', type=int, default=5000,
+            help="Chores generated and inserted at a time (default 5000).")
+        parser.add_argument('--seed', type=int,
+            help="Random seed, for repeatable data.")
+
+    def handle(self, *args, **options):
+        for name in ('children', 'tasks', 'chores'):
+            if options[name] < 0:
+                raise CommandError("--%s cannot be negative." % name)
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options['chores'] and not (options['children'] and options['tasks']):
+            raise CommandError("Chores need at least one child and one task.")
+
+        result = seed(options['children'], options['tasks'], options['chores'],
+            batch_size=options['batch_size'], rng=random.Random(options['seed']))
+        self.stdout.write(self.style.SUCCESS(
+            "Created %d children, %d tasks and %d chores in %.2f s (%.0f rows/s)." % (
+                result.children, result.tasks, result.chores, result.seconds, result.rows_per_second)))
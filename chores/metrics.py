@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+# Per-view request metrics
+#
+# For every URL name the registry keeps a request count and rolling windows of
+# the wall time, SQL query count and SQL time of recent requests, from which
+# the metrics endpoint reports p50/p95/p99. Recording is an append to a
+# bounded deque, so it is cheap enough to leave on in production; percentiles
+# are only computed when the metrics are read.
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_sql = threading.local()
+
+
+class Window(object):
+    """The most recent samples of one measurement, plus running totals over all samples."""
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.sum = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return dict((q, 0) for q in QUANTILES)
+        return dict((q, ordered[min(len(ordered) - 1, int(q * len(ordered)))]) for q in QUANTILES)
+
+
+class ViewMetrics(object):
+    MEASUREMENTS = ("wall_seconds", "sql_queries", "sql_seconds")
+
+    def __init__(self, size):
+        self.requests = 0
+        self.windows = dict((name, Window(size)) for name in self.MEASUREMENTS)
+
+
+class Registry(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view, wall_seconds, sql_queries, sql_seconds):
+        with self.lock:
+            metrics = self.views.get(view)
+            if metrics is None:
+                metrics = self.views[view] = ViewMetrics(getattr(settings, "CHORES_METRICS_WINDOW", 1024))
+            metrics.requests += 1
+            metrics.windows["wall_seconds"].add(wall_seconds)
+            metrics.windows["sql_queries"].add(sql_queries)
+            metrics.windows["sql_seconds"].add(sql_seconds)
+
+    def snapshot(self):
+        """A JSON-ready dict of view name -> request count and per-measurement quantiles."""
+        with self.lock:
+            result = {}
+            for view, metrics in sorted(self.views.items()):
+                entry = {"requests": metrics.requests}
+                for name, window in metrics.windows.items():
+                    quantiles = window.quantiles()
+                    entry[name] = {
+                        "p50": quantiles[0.5],
+                        "p95": quantiles[0.95],
+                        "p99": quantiles[0.99],
+                        "sum": window.sum,
+                        "count": window.count,
+                    }
+                result[view] = entry
+            return result
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+
+registry = Registry()
+
+
+def prometheus(snapshot):
+    """Renders a snapshot() in the Prometheus text exposition format."""
+    lines = [
+        "# HELP chores_requests_total Requests served, by URL name.",
+        "# TYPE chores_requests_total counter",
+    ]
+    for view, entry in snapshot.items():
+        lines.append('chores_requests_total{view="%s"} %d' % (view, entry["requests"]))
+    for name in ViewMetrics.MEASUREMENTS:
+        metric = "chores_request_" + name
+        lines.append("# HELP %s Recent per-request %s, by URL name." % (metric, name.replace("_", " ")))
+        lines.append("# TYPE %s summary" % metric)
+        for view, entry in snapshot.items():
+            values = entry[name]
+            for quantile, key in zip(QUANTILES, ("p50", "p95", "p99")):
+                lines.append('%s{view="%s",quantile="%s"} %s' % (metric, view, quantile, values[key]))
+            lines.append('%s_sum{view="%s"} %s' % (metric, view, values["sum"]))
+            lines.append('%s_count{view="%s"} %d' % (metric, view, values["count"]))
+    return "\n".join(lines) + "\n"
+
+
+# SQL timing
+
+class TimedCursor(object):
+    """Wraps a database cursor, adding each statement's count and time to the current thread's totals."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            _sql.queries = getattr(_sql, "queries", 0) + 1
+            _sql.seconds = getattr(_sql, "seconds", 0.0) + time.perf_counter() - start
+
+    def execute(self, sql, params=None):
+        return self._timed(self.cursor.execute, sql, params)
+
+    def executemany(self, sql, param_list):
+        return self._timed(self.cursor.executemany, sql, param_list)
+
+    def callproc(self, procname, params=None):
+        return self._timed(self.cursor.callproc, procname, params)
+
+
+def instrument(connection):
+    """Makes every cursor of connection report to the SQL totals (once per connection)."""
+    if getattr(connection, "_chores_timed", False):
+        return
+    make_cursor, make_debug_cursor = connection.make_cursor, connection.make_debug_cursor
+    connection.make_cursor = lambda cursor: TimedCursor(make_cursor(cursor))
+    connection.make_debug_cursor = lambda cursor: TimedCursor(make_debug_cursor(cursor))
+    connection._chores_timed = True
+
+
+def reset_sql():
+    _sql.queries = 0
+    _sql.seconds = 0.0
+
+
+def sql_totals():
+    return getattr(_sql, "queries", 0), getattr(_sql, "seconds", 0.0)
@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from chores import metrics
+from chores import routers
+
+
+class StatementTimeoutMiddleware(object):
+    """Has PostgreSQL cancel any statement that runs longer than CHORES_STATEMENT_TIMEOUT milliseconds.
+
+    The timeout is set with SET statement_timeout on each connection the process opens once it
+    serves requests, not in DATABASES, so migrations and management commands are never cancelled.
+    Connections persist between requests (CONN_MAX_AGE), so this costs one statement per connection.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.timeout = getattr(settings, 'CHORES_STATEMENT_TIMEOUT', 5000)
+        if self.timeout:
+            connection_created.connect(self.set_timeout, weak=False, dispatch_uid='chores.statement_timeout')
+            for connection in connections.all():
+                if connection.connection is not None:
+                    self.set_timeout(type(connection), connection)
+
+    def set_timeout(self, sender, connection, **kwargs):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s", [self.timeout])
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+class MetricsMiddleware(object):
+    """Records each request's wall time, SQL query count and SQL time under its URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for connection in connections.all():
+            metrics.instrument(connection)
+        metrics.reset_sql()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        wall_seconds = time.perf_counter() - start
+        queries, sql_seconds = metrics.sql_totals()
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        metrics.registry.record(view, wall_seconds, queries, sql_seconds)
+        return response
+
+
+class ReplicaPinMiddleware(object):
+    """After a write, keeps the client's reads on the primary for CHORES_REPLICA_PIN_SECONDS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and routers.replicas():
+            response.set_cookie(routers.PIN_COOKIE, '1', max_age=getattr(settings, 'CHORES_REPLICA_PIN_SECONDS', 5),
+                httponly=True)
+        return response
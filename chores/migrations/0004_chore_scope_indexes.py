@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 09:56
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0003_list_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chore',
+            index=models.Index(fields=['due_on', 'id'], name='chore_due_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chore',
+            index=models.Index(fields=['completed', 'due_on'], name='chore_completed_due_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chore',
+            index=models.Index(fields=['child', 'completed', 'due_on'], name='chore_child_completed_idx'),
+        ),
+    ]
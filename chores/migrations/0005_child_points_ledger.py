@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 09:57
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_points(apps, schema_editor):
+    Child = apps.get_model('chores', 'Child')
+    Chore = apps.get_model('chores', 'Chore')
+    completed = Chore.objects.filter(child=OuterRef('pk'), completed=True).order_by()
+    points = completed.values('child').annotate(total=Sum('task__points')).values('total')
+    Child.objects.update(points=Coalesce(Subquery(points, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0004_chore_scope_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='child',
+            name='points',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_points, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 10:23
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0007_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chore',
+            name='child',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='chores.Child'),
+        ),
+        migrations.AddIndex(
+            model_name='child',
+            index=models.Index(fields=['-points', 'id', 'active'], name='child_points_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 10:24
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0008_leaderboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedChore',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_on', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('child', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='chores.Child')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='chores.Task')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedchore',
+            index=models.Index(fields=['due_on', 'id'], name='archive_due_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedchore',
+            index=models.Index(fields=['child', 'due_on'], name='archive_child_due_on_idx'),
+        ),
+    ]
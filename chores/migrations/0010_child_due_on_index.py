@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 10:27
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0009_archived_chore'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chore',
+            index=models.Index(fields=['child', 'due_on', 'id'], name='chore_child_due_on_idx'),
+        ),
+    ]
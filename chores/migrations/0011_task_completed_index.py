@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 10:31
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0010_child_due_on_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chore',
+            name='task',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='chores.Task'),
+        ),
+        migrations.AddIndex(
+            model_name='chore',
+            index=models.Index(fields=['task', 'completed', 'due_on'], name='chore_task_completed_idx'),
+        ),
+    ]
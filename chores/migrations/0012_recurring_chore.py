@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 10:48
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0011_task_completed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringChore',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(max_length=255)),
+                ('starts_on', models.DateField(default=django.utils.timezone.localdate)),
+                ('active', models.BooleanField(default=True)),
+                ('materialized_through', models.DateField(blank=True, editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='chores.Child')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='chores.Task')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='chore',
+            name='schedule',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='chores.RecurringChore'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='chore',
+            unique_together=set([('schedule', 'due_on')]),
+        ),
+    ]
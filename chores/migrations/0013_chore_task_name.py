@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 10:59
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_task_names(apps, schema_editor):
+    Chore = apps.get_model('chores', 'Chore')
+    Task = apps.get_model('chores', 'Task')
+    Chore.objects.update(task_name=Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('name')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0012_recurring_chore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chore',
+            name='task_name',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_task_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chore',
+            index=models.Index(fields=['due_on', 'task_name', 'id'], name='chore_list_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.1 on 2026-10-18 11:06
+from __future__ import unicode_literals
+
+import datetime
+
+from dateutil.rrule import rrulestr
+from django.db import migrations, models
+
+
+# The first day each schedule recurs on after its high-water mark (after starts_on if it has none)
+def fill_next_on(apps, schema_editor):
+    RecurringChore = apps.get_model('chores', 'RecurringChore')
+    for schedule in RecurringChore.objects.iterator():
+        since = schedule.starts_on
+        if schedule.materialized_through is not None:
+            since = schedule.materialized_through + datetime.timedelta(days=1)
+        rule = rrulestr(schedule.rule, dtstart=datetime.datetime.combine(schedule.starts_on, datetime.time.min))
+        moment = rule.after(datetime.datetime.combine(since, datetime.time.min), inc=True)
+        RecurringChore.objects.filter(pk=schedule.pk).update(next_on=moment.date() if moment else None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chores', '0013_chore_task_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recurringchore',
+            name='next_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_next_on, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recurringchore',
+            index=models.Index(fields=['active', 'next_on'], name='recurring_next_on_idx'),
+        ),
+    ]
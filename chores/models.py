@@ -1,8 +1,15 @@
-from django.db import models
+import datetime
+
+from dateutil.rrule import rrule, rrulestr
+from django.db import models, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
-from functools import reduce
+
+from chores import caching
+from chores.deletion import delete_in_batches
 
 # Child, Task, and Chore Models
 
@@ -11,6 +18,20 @@ class Child(models.Model):
   first_name = models.CharField(max_length=255)
   last_name = models.CharField(max_length=255)
   active = models.BooleanField(default=True)
+  # Running total of the points of completed chores, kept up to date by
+  # Chore and Task writes (rebuild it with `manage.py rebuild_points`)
+  points = models.IntegerField(default=0, editable=False)
+  updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+  class Meta:
+    # Matches the keyset pagination order of the child list; the name indexes also serve search()
+    indexes = [
+      models.Index(fields=["last_name", "first_name", "id"], name="child_name_idx"),
+      models.Index(fields=["first_name", "last_name", "id"], name="child_first_name_idx"),
+      # The all-time leaderboard order, and the range a child's rank is counted over; active
+      # comes last so the index answers the active filter without other queries using it for that
+      models.Index(fields=["-points", "id", "active"], name="child_points_idx"),
+    ]
 
   # Scopes/Manager
   class QuerySet(models.QuerySet):
@@ -20,14 +41,54 @@ class Child(models.Model):
     def active(self):
       return self.filter(active=True)
 
+    # Children whose last or first name starts with prefix (see prefix_match)
+    def search(self, prefix):
+      return self.filter(prefix_match("last_name", prefix) | prefix_match("first_name", prefix))
+
+    # Annotates each child with total_points, the sum of the points of its completed chores
+    def with_points(self):
+      return self.annotate(total_points=points_total())
+
+    # Recomputes the points ledger of these children from their completed chores
+    def refresh_points(self):
+      caching.bump("points")
+      return self.update(points=points_total(), updated_at=timezone.now())
+
+    def add_points(self, points):
+      caching.bump("points")
+      return self.update(points=F("points") + points, updated_at=timezone.now())
+
+    # The chores go first, in batches (see delete_chores_of), leaving a small cascade
+    def delete(self):
+      delete_chores_of(self)
+      caching.bump("child", "chore", "archive")
+      return super().delete()
+
   objects = QuerySet.as_manager()
 
   # Methods
+  def save(self, *args, **kwargs):
+    caching.bump("child")
+    # The ledger is only written through refresh_points() and add_points(), so saving an
+    # instance loaded before a chore changed cannot put its stale points back
+    if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+      kwargs["update_fields"] = [field.name for field in self._meta.concrete_fields
+        if not field.primary_key and field.name != "points"]
+    super().save(*args, **kwargs)
+
+  def delete(self, *args, **kwargs):
+    delete_chores_of(Child.objects.filter(pk=self.pk))
+    caching.bump("child", "chore", "archive")
+    return super().delete(*args, **kwargs)
+
   def name(self):
     return self.first_name + " " + self.last_name
 
   def points_earned(self):
-    return reduce(lambda a,b: a+b, map(lambda chore: chore.task.points, self.chore_set.done()), 0)
+    # Children loaded through with_points() already carry their total
+    if hasattr(self, "total_points"):
+      return self.total_points
+    return Child.objects.filter(pk=self.pk).values_list("points", flat=True).get()
 
   # For debugging
   def __str__(self):
@@ -38,6 +99,13 @@ class Task(models.Model):
   name = models.CharField(max_length=255)
   points = models.PositiveIntegerField()
   active = models.BooleanField(default=True)
+  updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+  class Meta:
+    # Matches the keyset pagination order of the task list, and serves search()
+    indexes = [
+      models.Index(fields=["name", "id"], name="task_name_idx"),
+    ]
 
   # Scopes/Manager
   class QuerySet(models.QuerySet):
@@ -47,42 +115,291 @@ class Task(models.Model):
     def active(self):
       return self.filter(active=True)
 
+    def search(self, prefix):
+      return self.filter(prefix_match("name", prefix))
+
+    # Renaming tasks renames their chores' copy of the name, as Task.save() does. The ids are read
+    # first because the update may change what this queryset matches, as in filter(name=...).update(name=...)
+    def update(self, **kwargs):
+      if "name" not in kwargs:
+        return super().update(**kwargs)
+      with transaction.atomic():
+        tasks = list(self.order_by().values_list("pk", flat=True))
+        count = super().update(**kwargs)
+        Chore.objects.filter(task__in=tasks).update(task_name=task_name_of(OuterRef("task_id")))
+        caching.bump("task", "chore")
+      return count
+
+    # The chores go first, in batches that each refresh their children's ledgers (see chores.deletion),
+    # so no chore is left for the tasks' own delete to cascade to
+    def delete(self):
+      delete_in_batches(Chore.objects.filter(task__in=self))
+      delete_in_batches(ArchivedChore.objects.filter(task__in=self))
+      caching.bump("task", "chore", "archive")
+      return super().delete()
+
   objects = QuerySet.as_manager()
 
+  # Methods
+  def save(self, *args, **kwargs):
+    with transaction.atomic():
+      old = Task.objects.filter(pk=self.pk).values_list("points", "name").first() if self.pk else None
+      old_points = old[0] if old else None
+      caching.bump("task")
+      super().save(*args, **kwargs)
+      # Renaming the task renames its chores' copy of the name, which the chore list is ordered by
+      if old and old[1] != self.name:
+        Chore.objects.filter(task=self).update(task_name=self.name)
+        caching.bump("chore")
+      if old_points is not None and old_points != self.points:
+        Child.objects.filter(Q(pk__in=completed_children(task=self)) | Q(pk__in=archived_children(task=self))).refresh_points()
+
+  # As above: the batches refresh the ledgers
+  def delete(self, *args, **kwargs):
+    delete_in_batches(self.chore_set.all())
+    delete_in_batches(self.archivedchore_set.all())
+    caching.bump("task", "chore", "archive")
+    return super().delete(*args, **kwargs)
+
   # For debugging
   def __str__(self):
     return self.name
 
-class Chore(models.Model):
-  # Task fields
+class RecurringChore(models.Model):
+  # A schedule of chores for a child and task, repeating by an iCalendar recurrence rule such as
+  # "FREQ=WEEKLY;BYDAY=SA". `manage.py materialize_chores` creates its Chore rows for the days ahead
   child = models.ForeignKey(Child)
   task = models.ForeignKey(Task)
+  rule = models.CharField(max_length=255)
+  starts_on = models.DateField(default=timezone.localdate)
+  active = models.BooleanField(default=True)
+  # The high-water mark: chores are created up to and including this day (see chores.recurrence)
+  materialized_through = models.DateField(null=True, blank=True, editable=False)
+  # The first day after the high-water mark the rule recurs on; None once the rule has ended
+  next_on = models.DateField(null=True, blank=True, editable=False)
+  updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+  class Meta:
+    indexes = [
+      # The schedules the materializer still has to extend
+      models.Index(fields=["active", "next_on"], name="recurring_next_on_idx"),
+    ]
+
+  # The rule or start may have changed, so next_on is found again from starts_on
+  def save(self, *args, **kwargs):
+    self.next_on = None
+    self.next_on = self.next_day(self.pending_from())
+    super().save(*args, **kwargs)
+
+  def clean(self):
+    try:
+      self.recurrence()
+    except (ValueError, TypeError):
+      raise ValidationError({"rule": _("Enter a valid recurrence rule, such as FREQ=WEEKLY;BYDAY=SA.")})
+
+  # The first day that has no chores yet
+  def pending_from(self):
+    if self.materialized_through is None:
+      return self.starts_on
+    return self.materialized_through + datetime.timedelta(days=1)
+
+  # The rule as a dateutil rrule starting on starts_on, or, for the days from `since` on, starting
+  # on next_on so the materializer does not step through every past occurrence on each run. next_on
+  # is itself an occurrence, so INTERVAL and the BY* parts keep their phase. COUNT counts from
+  # starts_on, so those rules always start there; their count keeps that cheap.
+  def recurrence(self, since=None):
+    rule = rrulestr(self.rule, dtstart=datetime.datetime.combine(self.starts_on, datetime.time.min))
+    if since is None or self.next_on is None or since < self.pending_from():
+      return rule
+    if not isinstance(rule, rrule) or rule._count is not None:
+      return rule
+    return rrulestr(self.rule, dtstart=datetime.datetime.combine(self.next_on, datetime.time.min))
+
+  # The days the chore recurs on from start to end, both inclusive
+  def days(self, start, end):
+    between = self.recurrence(start).between(datetime.datetime.combine(start, datetime.time.min),
+      datetime.datetime.combine(end, datetime.time.max), inc=True)
+    return [moment.date() for moment in between]
+
+  # The first day on or after since the chore recurs on, or None if the rule has ended by then
+  def next_day(self, since):
+    moment = self.recurrence(since).after(datetime.datetime.combine(since, datetime.time.min), inc=True)
+    return moment.date() if moment else None
+
+  # For debugging
+  def __str__(self):
+    return "%s (%s)" % (self.task.name, self.rule)
+
+class Chore(models.Model):
+  # Task fields
+  # Indexed by chore_child_completed_idx and chore_task_completed_idx, which lead with them
+  child = models.ForeignKey(Child, db_index=False)
+  task = models.ForeignKey(Task, db_index=False)
   due_on = models.DateField()
   completed = models.BooleanField(default=False)
+  updated_at = models.DateTimeField(auto_now=True, db_index=True)
+  # A copy of task.name, so the chronological (due_on, task_name, id) order is read straight from
+  # chore_list_idx with no join or sort. Invariant: task_name == task.name for every row. save(),
+  # bulk_create() and update(task=...) here and Task.save() and Task.objects.update(name=...) keep
+  # it; anything else writing task_id or a task's name (raw SQL, a migration) must set it too
+  task_name = models.CharField(max_length=255, editable=False, default="")
+  # The schedule the chore was created from, if any; indexed by the unique (schedule, due_on)
+  schedule = models.ForeignKey(RecurringChore, null=True, blank=True, editable=False, db_index=False,
+    on_delete=models.SET_NULL)
+
+  class Meta:
+    # A schedule creates at most one chore a day
+    unique_together = [("schedule", "due_on")]
+    # One index per access pattern of the scopes below (see test_chore_indexes)
+    indexes = [
+      models.Index(fields=["due_on", "id"], name="chore_due_on_idx"),
+      models.Index(fields=["due_on", "task_name", "id"], name="chore_list_idx"),
+      models.Index(fields=["completed", "due_on"], name="chore_completed_due_on_idx"),
+      models.Index(fields=["child", "completed", "due_on"], name="chore_child_completed_idx"),
+      models.Index(fields=["child", "due_on", "id"], name="chore_child_due_on_idx"),
+      models.Index(fields=["task", "completed", "due_on"], name="chore_task_completed_idx"),
+    ]
 
   # Scopes/Manager
   class QuerySet(models.QuerySet):
+    # Loads the child and task in the same query so templates can read them freely
+    def with_related(self):
+      return self.select_related("child", "task")
+
     def chronological(self):
-      return self.order_by("due_on", "task__name")
+      return self.with_related().order_by("due_on", "task_name", "id")
 
     def done(self):
-      return self.filter(completed=True)
+      return self.with_related().filter(completed=True)
 
     def pending(self):
-      return self.filter(completed=False)
+      return self.with_related().filter(completed=False)
 
     def by_task(self):
-      return self.order_by("task__name")
+      return self.with_related().order_by("task_name")
 
+    # due_on is a date, so compare it with today's date in TIME_ZONE rather than a datetime
     def upcoming(self):
-      return self.filter(due_on__gte=timezone.now())
+      return self.filter(due_on__gte=timezone.localdate())
 
     def past(self):
-      return self.filter(due_on__lt=timezone.now())
+      return self.filter(due_on__lt=timezone.localdate())
+
+    # Chores due from start to end, both inclusive
+    def due_between(self, start, end):
+      return self.filter(due_on__range=(start, end))
+
+    # The most recent chores due by today, newest first
+    def recent(self):
+      return self.filter(due_on__lte=timezone.localdate()).order_by("-due_on", "-id")
+
+    # Pending, overdue and completed counts with a single conditional aggregation
+    def stats(self):
+      today = timezone.localdate()
+      return self.order_by().aggregate(
+        pending=Count(Case(When(completed=False, then=1))),
+        overdue=Count(Case(When(completed=False, due_on__lt=today, then=1))),
+        completed=Count(Case(When(completed=True, then=1))),
+      )
+
+    # Marks these chores completed (or pending) with a single UPDATE and returns
+    # how many changed; chores already in that state are left alone
+    def set_completed(self, completed):
+      with transaction.atomic():
+        changing = self.exclude(completed=completed)
+        children = list(changing.order_by().values_list("child_id", flat=True).distinct())
+        tasks = list(changing.order_by().values_list("task_id", flat=True).distinct())
+        count = changing.update(completed=completed, updated_at=timezone.now())
+        caching.bump("chore", *task_chores(*tasks))
+        Child.objects.filter(pk__in=children).refresh_points()
+      return count
+
+    # Moving chores to another task copies that task's name along, in the same UPDATE
+    def update(self, **kwargs):
+      task = kwargs.get("task", kwargs.get("task_id"))
+      if task is not None and "task_name" not in kwargs:
+        kwargs["task_name"] = task_name_of(getattr(task, "pk", task))
+      return super().update(**kwargs)
+
+    # Pass refresh_points=False when inserting many batches and refresh the ledger once at the end
+    def bulk_create(self, objs, batch_size=None, refresh_points=True):
+      # Chores built with a task instance already carry its name; the rest are looked up at once
+      objs, cache = list(objs), Chore._meta.get_field("task").get_cache_name()
+      missing = {chore.task_id for chore in objs if not hasattr(chore, cache)}
+      names = dict(Task.objects.filter(pk__in=missing).values_list("pk", "name")) if missing else {}
+      for chore in objs:
+        chore.task_name = chore.task.name if hasattr(chore, cache) else names.get(chore.task_id, "")
+      with transaction.atomic():
+        objs = super().bulk_create(objs, batch_size=batch_size)
+        caching.bump("chore", *task_chores(*{chore.task_id for chore in objs}))
+        if refresh_points:
+          Child.objects.filter(pk__in={chore.child_id for chore in objs if chore.completed}).refresh_points()
+      return objs
+
+    # Pass refresh_points=False when the children's ledgers are going too (see Child.delete)
+    def delete(self, refresh_points=True):
+      with transaction.atomic():
+        children = list(completed_children(pk__in=self.order_by().values("pk"))) if refresh_points else []
+        tasks = list(self.order_by().values_list("task_id", flat=True).distinct())
+        caching.bump("chore", *task_chores(*tasks))
+        result = super().delete()
+        if children:
+          Child.objects.filter(pk__in=children).refresh_points()
+      return result
+
+    # Moves the completed chores among these into ArchivedChore and returns how many moved.
+    # The points they earned stay on the ledger, which counts archived chores too.
+    def archive(self):
+      with transaction.atomic():
+        rows = list(self.filter(completed=True).order_by().values_list("pk", "child_id", "task_id", "due_on"))
+        ArchivedChore.objects.bulk_create(ArchivedChore(child_id=child_id, task_id=task_id, due_on=due_on)
+          for pk, child_id, task_id, due_on in rows)
+        # A plain delete: moving the rows leaves every ledger as it was
+        models.QuerySet.delete(Chore.objects.filter(pk__in=[row[0] for row in rows]))
+        caching.bump("chore", "archive", *task_chores(*{row[2] for row in rows}))
+      return len(rows)
 
   objects = QuerySet.as_manager()
 
   # Methods
+  def save(self, *args, **kwargs):
+    with transaction.atomic():
+      # A chore moved to another task changes the usage of both
+      old_task = self.lock()
+      old = self.points_entry()
+      caching.bump("chore", *task_chores(*{old_task, self.task_id} - {None}))
+      self.task_name = self.task.name
+      super().save(*args, **kwargs)
+      new = self.points_entry()
+      if old != new:
+        move_points(old, new)
+
+  def delete(self, *args, **kwargs):
+    with transaction.atomic():
+      self.lock()
+      old = self.points_entry()
+      caching.bump("chore", *task_chores(self.task_id))
+      result = super().delete(*args, **kwargs)
+      move_points(old, None)
+    return result
+
+  # Locks this chore's stored row until the transaction ends and returns its stored task id. Saves
+  # and deletes take the lock before reading points_entry(), so two concurrent completions of the
+  # same chore cannot both see it pending and add its points twice. Only the chore row is
+  # locked, not its task's, so writes to other chores of the task do not wait.
+  def lock(self):
+    if self.pk is None:
+      return None
+    return Chore.objects.select_for_update().filter(pk=self.pk).values_list("task_id", flat=True).first()
+
+  # The (child id, points, due date) this chore currently adds to the ledger, read from the
+  # database; the due date places the points in the weekly and monthly leaderboards
+  def points_entry(self):
+    if self.pk is None:
+      return None
+    entry = Chore.objects.filter(pk=self.pk, completed=True).values_list("child_id", "task__points", "due_on").first()
+    return tuple(entry) if entry else None
+
   def status(self):
     return "Completed" if self.completed else "Pending"
 
@@ -90,3 +407,104 @@ class Chore(models.Model):
   def __str__(self):
     return self.task.name
 
+
+class ArchivedChore(models.Model):
+  # A completed chore moved out of the Chore table by `manage.py archive_chores`. Archived
+  # chores are read-only, and their points still count towards the child's ledger.
+  child = models.ForeignKey(Child, db_index=False)
+  task = models.ForeignKey(Task)
+  due_on = models.DateField()
+  archived_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    indexes = [
+      # The archive list's keyset pagination order
+      models.Index(fields=["due_on", "id"], name="archive_due_on_idx"),
+      # A child's archived points
+      models.Index(fields=["child", "due_on"], name="archive_child_due_on_idx"),
+    ]
+
+  # Scopes/Manager
+  class QuerySet(models.QuerySet):
+    def with_related(self):
+      return self.select_related("child", "task")
+
+    def chronological(self):
+      return self.with_related().order_by("due_on", "id")
+
+    # Archived chores all earned points, so their children's ledgers change
+    def delete(self, refresh_points=True):
+      with transaction.atomic():
+        children = list(self.order_by().values_list("child_id", flat=True).distinct()) if refresh_points else []
+        caching.bump("archive")
+        result = super().delete()
+        if children:
+          Child.objects.filter(pk__in=children).refresh_points()
+      return result
+
+  objects = QuerySet.as_manager()
+
+  # For debugging
+  def __str__(self):
+    return self.task.name
+
+# Points ledger helpers
+
+# Sum of the points of the completed chores, live and archived, of the child in the outer query
+def points_total():
+  completed = Chore.objects.filter(child=OuterRef("pk"), completed=True).order_by()
+  points = completed.values("child").annotate(total=Sum("task__points")).values("total")
+  archived = ArchivedChore.objects.filter(child=OuterRef("pk")).order_by()
+  archived_points = archived.values("child").annotate(total=Sum("task__points")).values("total")
+  return (Coalesce(Subquery(points, output_field=IntegerField()), 0) +
+    Coalesce(Subquery(archived_points, output_field=IntegerField()), 0))
+
+# The name of a task as a subquery, for setting Chore.task_name in an UPDATE
+def task_name_of(task):
+  return Subquery(Task.objects.filter(pk=task).values("name")[:1])
+
+# Deletes the live and archived chores of the given children in batches (see chores.deletion)
+# ahead of the children themselves. The ledgers involved are those of the children going, so no
+# batch refreshes them. Should a batch fail, the children stay with fewer chores, so their ledgers
+# are refreshed before the error goes on; a process killed outright between batches leaves them
+# stale until `manage.py rebuild_points`.
+def delete_chores_of(children):
+  try:
+    delete_in_batches(Chore.objects.filter(child__in=children), refresh_points=False)
+    delete_in_batches(ArchivedChore.objects.filter(child__in=children), refresh_points=False)
+  except BaseException:
+    children.refresh_points()
+    raise
+
+# Ids of the children with a completed chore matching the given filters
+def completed_children(**filters):
+  return Chore.objects.filter(completed=True, **filters).order_by().values_list("child_id", flat=True).distinct()
+
+# Version names of the chores of each task, which the task's usage statistics are cached under
+def task_chores(*task_ids):
+  return ["task_chores.%d" % task_id for task_id in task_ids]
+
+# Ids of the children with an archived chore matching the given filters
+def archived_children(**filters):
+  return ArchivedChore.objects.filter(**filters).order_by().values_list("child_id", flat=True).distinct()
+
+# Moves a chore's contribution from one (child id, points, due date) ledger entry to another
+def move_points(old, new):
+  if old:
+    Child.objects.filter(pk=old[0]).add_points(-old[1])
+  if new:
+    Child.objects.filter(pk=new[0]).add_points(new[1])
+
+
+# Search helpers
+
+# Matches values of field starting with prefix, as typed or with its first letter capitalized.
+# Each prefix is a range (prefix <= value < next prefix) rather than a LIKE, so it is answered
+# from the field's index on every database.
+def prefix_match(field, prefix):
+  match = Q()
+  for start in {prefix, prefix[:1].upper() + prefix[1:]}:
+    if start:
+      end = start[:-1] + chr(ord(start[-1]) + 1)
+      match |= Q(**{field + "__gte": start, field + "__lt": end})
+  return match
@@ -0,0 +1,201 @@
+import base64
+import json
+from functools import reduce
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+
+# Keyset (cursor) pagination
+#
+# Instead of OFFSET, each page remembers the ordering keys of its first and
+# last rows and the next page filters on "keys greater than the last row".
+# The filter also bounds the first key on its own (due_on >= x AND (...)),
+# which the database can seek to in an index on the keys in order, so with
+# such an index every page costs the same, however deep it is. Every key must
+# be a column of the paginated table: ordering on a joined column (such as
+# task__name) makes the database sort all the rows past the cursor instead.
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=DjangoJSONEncoder).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values
+
+
+class KeysetPage(object):
+    """One page of rows; the query runs the first time the rows are needed."""
+
+    def __init__(self, paginator, after=None, before=None):
+        self.paginator = paginator
+        self.after = after
+        self.before = before
+
+    @cached_property
+    def _rows(self):
+        per_page = self.paginator.per_page
+        if self.before is not None:
+            rows = list(self.paginator.rows_before(self.before)[:per_page + 1])
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            rows.reverse()
+            return rows, True, has_more
+        if self.after is not None:
+            rows = list(self.paginator.rows_after(self.after)[:per_page + 1])
+            return rows[:per_page], len(rows) > per_page, True
+        rows = list(self.paginator.ordered()[:per_page + 1])
+        return rows[:per_page], len(rows) > per_page, False
+
+    @property
+    def object_list(self):
+        return self._rows[0]
+
+    @property
+    def has_next(self):
+        return self._rows[1] and bool(self.object_list)
+
+    @property
+    def has_previous(self):
+        return self._rows[2] and bool(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        if self.has_next:
+            return encode_cursor(self.paginator.keys_for(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous:
+            return encode_cursor(self.paginator.keys_for(self.object_list[0]))
+
+    @property
+    def next_query(self):
+        return self.paginator.query_string(after=self.next_cursor)
+
+    @property
+    def previous_query(self):
+        return self.paginator.query_string(before=self.previous_cursor)
+
+    # What the rendered page depends on besides the data: the cursor, normalized, and the size.
+    # Cached fragments vary on this rather than on the raw URL, so junk query parameters share one
+    @property
+    def cache_key(self):
+        return self.paginator.query_string(
+            after=encode_cursor(self.after) if self.after is not None else None,
+            before=encode_cursor(self.before) if self.before is not None else None) or "first"
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __getitem__(self, index):
+        # Templates try page["name"] before page.name; answer that without running the query
+        if isinstance(index, str):
+            raise TypeError(index)
+        return self.object_list[index]
+
+
+class KeysetPaginator(object):
+    """Paginates a queryset on an ascending, unique tuple of keys (end the keys with "id")."""
+
+    def __init__(self, queryset, keys, per_page, extra_params=None):
+        self.queryset = queryset
+        self.keys = list(keys)
+        self.per_page = per_page
+        self.extra_params = extra_params or {}
+
+    def ordered(self):
+        return self.queryset.order_by(*self.keys)
+
+    def keys_for(self, obj):
+        return [reduce(getattr, key.split("__"), obj) for key in self.keys]
+
+    def _field(self, key):
+        model = self.queryset.model
+        for name in key.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model
+        return field
+
+    def clean_cursor(self, cursor):
+        values = decode_cursor(cursor)
+        if len(values) != len(self.keys):
+            raise InvalidCursor(cursor)
+        try:
+            return [self._field(key).to_python(value) for key, value in zip(self.keys, values)]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+
+    def _seek(self, values, lookup):
+        # (a, b, c) > (x, y, z)  <=>  a > x or (a = x and b > y) or (a = x and b = y and c > z)
+        condition = Q()
+        for i, key in enumerate(self.keys):
+            term = Q(**{"%s__%s" % (key, lookup): values[i]})
+            for previous, value in zip(self.keys[:i], values[:i]):
+                term &= Q(**{previous: value})
+            condition |= term
+        # The redundant a >= x is the index range the OR alone does not give the planner
+        return Q(**{"%s__%se" % (self.keys[0], lookup): values[0]}) & condition
+
+    def rows_after(self, values):
+        return self.ordered().filter(self._seek(values, "gt"))
+
+    def rows_before(self, values):
+        descending = ["-" + key for key in self.keys]
+        return self.queryset.filter(self._seek(values, "lt")).order_by(*descending)
+
+    def page(self, after=None, before=None):
+        return KeysetPage(self,
+            after=self.clean_cursor(after) if after else None,
+            before=self.clean_cursor(before) if before else None)
+
+    def query_string(self, **params):
+        params.update(self.extra_params)
+        return urlencode(sorted((k, v) for k, v in params.items() if v is not None))
+
+
+def get_page_size(request):
+    default = getattr(settings, "CHORES_PAGE_SIZE", 25)
+    maximum = getattr(settings, "CHORES_MAX_PAGE_SIZE", 100)
+    try:
+        size = int(request.GET.get("per_page", default))
+    except ValueError:
+        size = default
+    return max(1, min(size, maximum))
+
+
+def paginate(request, queryset, keys):
+    """Returns the requested page of queryset, raising Http404 for a malformed cursor."""
+    extra_params = {}
+    if "per_page" in request.GET:
+        extra_params["per_page"] = get_page_size(request)
+    paginator = KeysetPaginator(queryset, keys, get_page_size(request), extra_params)
+    try:
+        return paginator.page(after=request.GET.get("after"), before=request.GET.get("before"))
+    except InvalidCursor:
+        raise Http404("Invalid page cursor")
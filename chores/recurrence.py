@@ -0,0 +1,77 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from chores.models import Chore, RecurringChore
+
+# Recurring chore materialization
+#
+# materialize() creates the Chore rows of every active RecurringChore for a
+# rolling window of days ahead. Each schedule remembers the last day it was
+# materialized through (its high-water mark) and the next day its rule recurs
+# on after that, so a run only computes and inserts the days that came into
+# the window since the previous run, starting the rule from that next day
+# rather than from its first, and schedules whose next day is past the end of
+# the window (or whose rule has ended) are not even read. Schedules are
+# handled batch_size at a time, each batch in one transaction: their rows are
+# locked (on databases that support it) and read again, skipping any paused or
+# extended since they were listed, the few chores that already exist on their
+# new days are read with one query and skipped, the rest go in with one bulk
+# insert, and the high-water marks move with one UPDATE per distinct next day. The unique (schedule, due_on) constraint backs this up, so
+# no run can ever create a schedule's chore twice. Past days are never
+# filled in: a schedule that starts or resumes materializing begins today.
+
+BATCH_SCHEDULES = 500
+
+
+class MaterializeResult(object):
+    def __init__(self, through):
+        self.through = through
+        self.schedules = 0
+        self.chores = 0
+
+
+def _behind(through):
+    """The active schedules with a day to materialize through `through`."""
+    return RecurringChore.objects.filter(active=True, next_on__lte=through)
+
+
+def _materialize_batch(ids, today, through, result):
+    with transaction.atomic():
+        schedules = list(_behind(through).filter(pk__in=ids).select_for_update())
+        chores, following = [], defaultdict(list)
+        for schedule in schedules:
+            start = max(today, schedule.pending_from())
+            chores.extend(Chore(child_id=schedule.child_id, task_id=schedule.task_id, due_on=day, schedule=schedule)
+                for day in schedule.days(start, through))
+            following[schedule.next_day(through + datetime.timedelta(days=1))].append(schedule.pk)
+        if chores:
+            # Read through the unique (schedule, due_on) index, from the earliest new day on
+            existing = set(Chore.objects.filter(schedule_id__in={chore.schedule_id for chore in chores},
+                due_on__gte=min(chore.due_on for chore in chores)).values_list('schedule_id', 'due_on'))
+            chores = [chore for chore in chores if (chore.schedule_id, chore.due_on) not in existing]
+            Chore.objects.bulk_create(chores)
+        for next_on, pks in following.items():
+            RecurringChore.objects.filter(pk__in=pks).update(materialized_through=through, next_on=next_on,
+                updated_at=timezone.now())
+    result.schedules += len(schedules)
+    result.chores += len(chores)
+
+
+def materialize(days=None, batch_size=BATCH_SCHEDULES):
+    """Creates the chores of every active schedule through `days` days from today and returns a MaterializeResult."""
+    days = getattr(settings, 'CHORES_RECURRENCE_DAYS', 28) if days is None else days
+    today = timezone.localdate()
+    through = today + datetime.timedelta(days=days)
+    result = MaterializeResult(through)
+    behind = _behind(through)
+    last = 0
+    while True:
+        ids = list(behind.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return result
+        _materialize_batch(ids, today, through, result)
+        last = ids[-1]
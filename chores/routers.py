@@ -0,0 +1,65 @@
+import random
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Read replicas
+#
+# Pages that only read (the list, detail and agenda views) opt in with
+# @replica_reads, which sends every query of the request to one of the
+# CHORES_REPLICAS aliases. Everything else, and every write, uses the primary
+# (the default alias). A client that has just written something would not
+# find it on a lagging replica, so after any POST the ReplicaPinMiddleware
+# sets a short-lived cookie that keeps that client's reads on the primary;
+# this covers the redirect to the detail page after a create or update.
+#
+# The shared caches (rendered fragments, table states, task usage and the
+# leaderboard) are keyed on version counters that writes on the primary
+# bump, so a value read from a lagging replica would sit under the current
+# version and be served to everyone, the pinned clients included, until the
+# next write. Replica requests read those caches but never fill them: see
+# reading_replica() and caching.fill().
+
+PIN_COOKIE = 'chores_primary'
+
+_state = threading.local()
+
+
+def replicas():
+    return getattr(settings, 'CHORES_REPLICAS', [])
+
+
+def replica_reads(get):
+    """Decorates a View's get(request, ...) to read from a replica, unless the client is pinned to the primary."""
+    @wraps(get)
+    def wrapper(self, request, *args, **kwargs):
+        aliases = replicas()
+        if not aliases or PIN_COOKIE in request.COOKIES:
+            return get(self, request, *args, **kwargs)
+        _state.alias = random.choice(aliases)
+        try:
+            return get(self, request, *args, **kwargs)
+        finally:
+            _state.alias = None
+    return wrapper
+
+
+def reading_replica():
+    """Whether the current request reads from a replica."""
+    return getattr(_state, 'alias', None) is not None
+
+
+class ReplicaRouter(object):
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'alias', None)
+
+    # Explicitly the primary: without a router's answer Django would write an
+    # instance back to the database it was read from
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    # The primary and its replicas hold the same rows
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
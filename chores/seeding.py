@@ -0,0 +1,92 @@
+import datetime
+import random
+
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from chores import caching
+from chores.models import Child, Chore, Task
+
+# Bulk data generation
+#
+# seed() writes children, tasks and chores with batched bulk inserts in a
+# single transaction. Chores are generated and inserted batch_size at a time
+# so memory stays flat, and the points ledger is rebuilt once at the end
+# instead of after every batch. Django splits each batch into INSERT
+# statements as large as the database allows (SQLite caps a statement at
+# 500 rows), so batch_size is not passed on to bulk_create.
+
+TASKS = (
+    ("Wash dishes", 1), ("Sweep floor", 1), ("Make bed", 1), ("Feed the dog", 1),
+    ("Take out trash", 1), ("Set the table", 1), ("Water plants", 1), ("Fold laundry", 2),
+    ("Vacuum living room", 2), ("Mow grass", 2), ("Clean bathroom", 3), ("Wash car", 3),
+    ("Rake leaves", 3), ("Shovel driveway", 3), ("Stack wood", 4), ("Clean garage", 5),
+)
+
+NAME_POOL = 500
+
+
+class SeedResult(object):
+    def __init__(self, children, tasks, chores, seconds):
+        self.children = children
+        self.tasks = tasks
+        self.chores = chores
+        self.seconds = seconds
+
+    @property
+    def rows(self):
+        return self.children + self.tasks + self.chores
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+
+def _new_ids(model, after):
+    # bulk_create only returns primary keys on PostgreSQL, so read the new ones back
+    return list(model.objects.filter(pk__gt=after).order_by('pk').values_list('pk', flat=True))
+
+
+def _last_id(model):
+    return model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def seed(children, tasks, chores, batch_size=5000, days_back=90, days_ahead=30, rng=None, clock=None):
+    """Inserts the given numbers of children, tasks and chores and returns a SeedResult."""
+    rng = rng or random.Random()
+    clock = clock or datetime.datetime.now
+    faker = Faker()
+    faker.seed(rng.randint(0, 2 ** 31))
+    # Faker is slow per call, so draw pools of names once and combine them
+    first_names = [faker.first_name() for i in range(min(children, NAME_POOL))]
+    last_names = [faker.last_name() for i in range(min(children, NAME_POOL))]
+    today = timezone.localdate()
+    start = clock()
+
+    with transaction.atomic():
+        last_child, last_task = _last_id(Child), _last_id(Task)
+        Child.objects.bulk_create((Child(first_name=rng.choice(first_names), last_name=rng.choice(last_names),
+            active=rng.random() < 0.9) for i in range(children)))
+        Task.objects.bulk_create((Task(name=name if i < len(TASKS) else "%s %d" % (name, i // len(TASKS) + 1),
+            points=points, active=rng.random() < 0.95)
+            for i, (name, points) in ((i, TASKS[i % len(TASKS)]) for i in range(tasks))))
+        child_ids, task_ids = _new_ids(Child, last_child), _new_ids(Task, last_task)
+
+        remaining = chores if child_ids and task_ids else 0
+        while remaining:
+            batch = []
+            for i in range(min(batch_size, remaining)):
+                due_on = today + datetime.timedelta(days=rng.randint(-days_back, days_ahead))
+                # Most past chores got done, a few future ones were done early
+                completed = rng.random() < (0.85 if due_on < today else 0.1)
+                batch.append(Chore(child_id=rng.choice(child_ids), task_id=rng.choice(task_ids),
+                    due_on=due_on, completed=completed))
+            Chore.objects.bulk_create(batch, refresh_points=False)
+            remaining -= len(batch)
+
+        Child.objects.filter(pk__in=Chore.objects.filter(child_id__gt=last_child).values('child_id')).refresh_points()
+        caching.bump("child", "task", "chore")
+
+    seconds = (clock() - start).total_seconds()
+    return SeedResult(len(child_ids), len(task_ids), chores if child_ids and task_ids else 0, seconds)
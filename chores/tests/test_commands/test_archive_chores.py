@@ -0,0 +1,47 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from chores.models import *
+from chores.tests.utilities import *
+
+
+class ArchiveChoresTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def setUp(self):
+        self.long_ago = timezone.localdate() - datetime.timedelta(days=90)
+        Chore.objects.filter(pk__in=[self.factories.ac3.pk, self.factories.mc3.pk]).update(due_on=self.long_ago)
+
+    def test_archives_old_completed_chores(self):
+        out = StringIO()
+        call_command('archive_chores', '--older-than', '60', '--batch-size', '1', stdout=out)
+        self.assertIn("Archived 1 chores...", out.getvalue())
+        self.assertIn("Archived 2 chores due before", out.getvalue())
+        self.assertEqual(2, ArchivedChore.objects.filter(due_on=self.long_ago).count())
+        self.assertFalse(Chore.objects.filter(due_on=self.long_ago).exists())
+        self.assertEqual(5, Chore.objects.count())
+        self.assertEqual(4, self.factories.alex.points_earned())
+        self.assertEqual(1, self.factories.mark.points_earned())
+
+    def test_keeps_pending_chores(self):
+        Chore.objects.filter(pk=self.factories.mc3.pk).update(completed=False)
+        call_command('archive_chores', '--older-than', '60', stdout=StringIO())
+        self.assertEqual(1, ArchivedChore.objects.count())
+        self.assertTrue(Chore.objects.filter(pk=self.factories.mc3.pk).exists())
+
+    def test_keeps_current_periods(self):
+        err = StringIO()
+        call_command('archive_chores', '--older-than', '0', stdout=StringIO(), stderr=err)
+        self.assertIn("Keeping the chores of the current week and month", err.getvalue())
+        self.assertEqual(2, ArchivedChore.objects.count())
+        self.assertTrue(Chore.objects.filter(pk=self.factories.ac4.pk).exists())
+
+    def test_validates_options(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_chores', '--older-than', '-1', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('archive_chores', '--older-than', '60', '--batch-size', '0', stdout=StringIO())
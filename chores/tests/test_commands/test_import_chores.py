@@ -0,0 +1,79 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from chores.models import *
+from chores.tests.utilities import *
+
+
+class ImportChoresTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def import_csv(self, text, *args):
+        f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        with f:
+            f.write(text)
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_chores', f.name, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_by_name_and_id(self):
+        out, err = self.import_csv(
+            "child,task,due_on,completed\n"
+            "Rachel Heimann,Mow grass,2030-01-01,True\n"
+            "%d,%d,2030-01-02,False\n"
+            "Rachel Heimann,Sweep floor,2030-01-03,\n" % (self.factories.rachel.id, self.factories.wood.id))
+        self.assertIn("Imported 3 chores (0 already existed, 0 rows had errors).", out)
+        self.assertEqual(err, "")
+        chores = list(Chore.objects.filter(child=self.factories.rachel).order_by('due_on'))
+        self.assertEqual([(chore.task, chore.completed) for chore in chores],
+            [(self.factories.mow, True), (self.factories.wood, False), (self.factories.sweep, False)])
+        self.assertEqual(2, self.factories.rachel.points_earned())
+
+    def test_reports_row_errors(self):
+        out, err = self.import_csv(
+            "child,task,due_on,completed\n"
+            "Nobody,Mow grass,2030-01-01,False\n"
+            "Rachel Heimann,Mow grass,someday,False\n"
+            "Rachel Heimann,Mow grass,2030-01-01,False\n"
+            ",,,\n", '--batch-size', '2', '--max-errors', '2')
+        self.assertIn("Imported 1 chores (0 already existed, 3 rows had errors).", out)
+        self.assertIn("Line 2: child: Select a valid choice.", err)
+        self.assertIn("Line 3: due_on: Enter a valid date.", err)
+        self.assertIn("... and 1 more rows with errors.", err)
+        self.assertEqual(1, Chore.objects.filter(child=self.factories.rachel).count())
+
+    def test_skips_existing_and_repeated_chores(self):
+        ac1 = self.factories.ac1
+        out, err = self.import_csv(
+            "id,child,task,points,due_on,completed\n"
+            "%d,Alex Heimann,Wash dishes,1,%s,False\n"
+            "0,Alex Heimann,Mow grass,2,2030-01-01,False\n"
+            "0,Alex Heimann,Mow grass,2,2030-01-01,False\n" % (ac1.id, ac1.due_on.date()))
+        self.assertIn("Imported 1 chores (2 already existed, 0 rows had errors).", out)
+        self.assertEqual(8, Chore.objects.count())
+
+    def test_ambiguous_name(self):
+        ChildFactory.create(first_name="Alex", last_name="Heimann")
+        out, err = self.import_csv("child,task,due_on\nAlex Heimann,Mow grass,2030-01-01\n")
+        self.assertIn("More than one matches 'Alex Heimann'; use the id instead.", err)
+
+    def test_numeric_references_are_ids_first(self):
+        # A task named after another task's id, and one named after no task's id
+        named_like_id = TaskFactory.create(name=str(self.factories.mow.id))
+        numbered = TaskFactory.create(name="9999")
+        rachel = self.factories.rachel.id
+        self.import_csv("child,task,due_on\n%d,%d,2030-01-01\n%d,9999,2030-01-02\n" % (rachel, self.factories.mow.id, rachel))
+        chores = list(Chore.objects.filter(child=self.factories.rachel).order_by('due_on'))
+        self.assertEqual([chore.task for chore in chores], [self.factories.mow, numbered])
+        self.assertFalse(named_like_id.chore_set.exists())
+
+    def test_bad_files(self):
+        with self.assertRaisesMessage(CommandError, "The file has no due_on column."):
+            self.import_csv("child,task\nAlex Heimann,Mow grass\n")
+        with self.assertRaises(CommandError):
+            call_command('import_chores', '/nonexistent.csv', stdout=StringIO())
@@ -0,0 +1,86 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from chores import recurrence
+from chores.models import *
+from chores.tests.utilities import *
+
+
+class MaterializeChoresTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.daily = RecurringChore.objects.create(child=self.factories.alex, task=self.factories.dishes,
+            rule="FREQ=DAILY", starts_on=self.today - datetime.timedelta(days=10))
+        self.weekly = RecurringChore.objects.create(child=self.factories.mark, task=self.factories.mow,
+            rule="FREQ=WEEKLY", starts_on=self.today)
+
+    def materialize(self, *args):
+        out = StringIO()
+        call_command('materialize_chores', *args, stdout=out)
+        return out.getvalue()
+
+    def test_materializes_window(self):
+        out = self.materialize('--days', '13', '--batch-size', '1')
+        self.assertIn("Created 16 chores for 2 schedules through %s" % (self.today + datetime.timedelta(days=13)), out)
+        # Past days are not filled in
+        self.assertEqual(
+            [self.today + datetime.timedelta(days=day) for day in range(14)],
+            list(self.daily.chore_set.order_by('due_on').values_list('due_on', flat=True)))
+        self.assertEqual(2, self.weekly.chore_set.filter(child=self.factories.mark, task=self.factories.mow).count())
+        self.assertEqual(self.today + datetime.timedelta(days=13), RecurringChore.objects.get(pk=self.daily.pk).materialized_through)
+
+    def test_only_new_days(self):
+        self.materialize('--days', '13')
+        with self.assertNumQueries(1):
+            self.assertIn("Created 0 chores for 0 schedules", self.materialize('--days', '13'))
+        later = self.today + datetime.timedelta(days=2)
+        with mock.patch('django.utils.timezone.localdate', return_value=later):
+            # Two more days of dishes, and the mowing two weeks from today
+            self.assertIn("Created 3 chores for 2 schedules", self.materialize('--days', '13'))
+        self.assertEqual(16, self.daily.chore_set.count())
+        self.assertEqual(3, self.weekly.chore_set.count())
+
+    def test_skips_existing_and_inactive(self):
+        Chore.objects.create(child=self.factories.alex, task=self.factories.dishes, due_on=self.today, schedule=self.daily)
+        RecurringChore.objects.filter(pk=self.weekly.pk).update(active=False)
+        recurrence.materialize(days=1)
+        self.assertEqual(2, self.daily.chore_set.count())
+        self.assertFalse(self.weekly.chore_set.exists())
+
+    def test_skips_schedules_paused_after_listing(self):
+        RecurringChore.objects.filter(pk=self.weekly.pk).update(active=False)
+        result = recurrence.MaterializeResult(self.today + datetime.timedelta(days=1))
+        recurrence._materialize_batch([self.daily.pk, self.weekly.pk], self.today, result.through, result)
+        self.assertEqual((1, 2), (result.schedules, result.chores))
+        self.assertFalse(self.weekly.chore_set.exists())
+        self.assertIsNone(RecurringChore.objects.get(pk=self.weekly.pk).materialized_through)
+
+    def test_ended_rules_are_not_read(self):
+        RecurringChore.objects.all().delete()
+        ending = RecurringChore.objects.create(child=self.factories.alex, task=self.factories.mow,
+            rule="FREQ=DAILY;COUNT=3", starts_on=self.today)
+        recurrence.materialize(days=1)
+        with mock.patch('django.utils.timezone.localdate', return_value=self.today + datetime.timedelta(days=2)):
+            self.assertIn("Created 1 chores for 1 schedules", self.materialize('--days', '13'))
+        self.assertIsNone(RecurringChore.objects.get(pk=ending.pk).next_on)
+        with self.assertNumQueries(1):
+            self.assertIn("Created 0 chores for 0 schedules", self.materialize('--days', '30'))
+
+    def test_no_duplicates(self):
+        recurrence.materialize(days=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Chore.objects.create(child=self.factories.alex, task=self.factories.dishes, due_on=self.today, schedule=self.daily)
+
+    def test_validates_options(self):
+        with self.assertRaises(CommandError):
+            self.materialize('--days', '-1')
+        with self.assertRaises(CommandError):
+            self.materialize('--batch-size', '0')
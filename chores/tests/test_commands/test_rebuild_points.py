@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from chores.models import *
+from chores.tests.utilities import *
+
+
+class RebuildPointsTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def test_no_drift(self):
+        out = StringIO()
+        call_command('rebuild_points', '--check', stdout=out)
+        self.assertIn("All 3 ledgers match", out.getvalue())
+
+    def test_check_reports_drift(self):
+        Child.objects.filter(pk=self.factories.alex.pk).update(points=99)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_points', '--check', stdout=StringIO())
+        self.assertEqual(99, self.factories.alex.points_earned())
+
+    def test_repairs_drift(self):
+        Child.objects.update(points=0)
+        out = StringIO()
+        call_command('rebuild_points', stdout=out)
+        self.assertIn("Repaired 2 drifted ledgers", out.getvalue())
+        self.assertEqual(4, self.factories.alex.points_earned())
+        self.assertEqual(1, self.factories.mark.points_earned())
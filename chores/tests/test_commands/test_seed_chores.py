@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+
+from chores.models import *
+from chores.tests.utilities import *
+
+
+class SeedChoresTests(FactoryTestCase):
+
+    def test_creates_requested_rows(self):
+        out = StringIO()
+        call_command('seed_chores', '--children', '7', '--tasks', '20', '--chores', '450',
+            '--batch-size', '100', '--seed', '1', stdout=out)
+        self.assertEqual(7, Child.objects.count())
+        self.assertEqual(20, Task.objects.count())
+        self.assertEqual(450, Chore.objects.count())
+        self.assertIn("Created 7 children, 20 tasks and 450 chores", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+    def test_ledger_matches_chores(self):
+        call_command('seed_chores', '--children', '5', '--tasks', '4', '--chores', '300', '--seed', '2', stdout=StringIO())
+        self.assertTrue(Chore.objects.done().exists())
+        self.assertFalse(Child.objects.with_points().exclude(points=F('total_points')).exists())
+
+    def test_adds_to_existing_rows(self):
+        self.factories.populate_chores()
+        before, alex_chores = Chore.objects.count(), Chore.objects.filter(child=self.factories.alex).count()
+        call_command('seed_chores', '--children', '2', '--tasks', '2', '--chores', '10', stdout=StringIO())
+        self.assertEqual(before + 10, Chore.objects.count())
+        self.assertEqual(alex_chores, Chore.objects.filter(child=self.factories.alex).count())
+        self.assertFalse(Child.objects.with_points().exclude(points=F('total_points')).exists())
+
+    def test_rejects_chores_without_children(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_chores', '--children', '0', '--chores', '10', stdout=StringIO())
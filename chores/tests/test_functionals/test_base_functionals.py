@@ -3,6 +3,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.contrib.staticfiles.testing import StaticLiveServerTestCase
 
@@ -16,6 +17,11 @@ driverType = "geckodriver"
 class FactoryFunctionalTestCase(StaticLiveServerTestCase):
     factories = Populate()
 
+    # The cache outlives each test's flushed database, so start every test with it empty
+    def _pre_setup(self):
+        super()._pre_setup()
+        cache.clear()
+
     # Auxiliary function to add view subdir to URL
     def get_full_url(self, url):
         return self.live_server_url + url
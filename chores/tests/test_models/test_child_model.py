@@ -1,4 +1,8 @@
+from unittest import mock
+
 from django.core.exceptions import ValidationError
+from django.db import OperationalError
+from django.test import override_settings
 from django.utils import timezone
 
 from chores.models import *
@@ -6,9 +10,7 @@ from chores.tests.utilities import *
 
 
 class ChildTests(FactoryTestCase):
-
-	def setUp(self):
-		self.factories.populate_chores()
+	populate = "populate_chores"
 
 	def test_validations(self):
 		with self.assertRaises(ValidationError):
@@ -29,8 +31,112 @@ class ChildTests(FactoryTestCase):
 		self.assertEqual(1, self.factories.mark.points_earned())
 		self.assertEqual(0, self.factories.rachel.points_earned())
 
+	def test_points_earned_single_query(self):
+		with self.assertNumQueries(1):
+			self.assertEqual(4, self.factories.alex.points_earned())
+
+	def test_points_ledger(self):
+		alex = self.factories.alex
+		chore = ChoreFactory.create(child=alex, task=self.factories.mow)
+		self.assertEqual(4, alex.points_earned())
+		chore.completed = True
+		chore.save()
+		self.assertEqual(6, alex.points_earned())
+		chore.child = self.factories.mark
+		chore.save()
+		self.assertEqual(4, alex.points_earned())
+		self.assertEqual(3, self.factories.mark.points_earned())
+		chore.delete()
+		self.assertEqual(1, self.factories.mark.points_earned())
+		chore = ChoreFactory.create(child=alex, task=self.factories.mow, completed=True)
+		chore.completed = False
+		chore.save()
+		self.assertEqual(4, alex.points_earned())
+
+	def test_save_keeps_ledger(self):
+		child = ChildFactory.create(first_name="Stale")
+		ChoreFactory.create(child=child, task=self.factories.mow, completed=True)
+		child.first_name = "Zed"
+		child.save()
+		self.assertEqual(2, child.points_earned())
+		self.assertEqual("Zed", Child.objects.get(pk=child.pk).first_name)
+
+	def test_points_ledger_follows_tasks(self):
+		self.factories.shovel.points = 10
+		self.factories.shovel.save()
+		self.assertEqual(11, self.factories.alex.points_earned())
+		self.factories.dishes.delete()
+		self.assertEqual(10, self.factories.alex.points_earned())
+		Chore.objects.filter(task=self.factories.sweep).delete()
+		self.assertEqual(0, self.factories.mark.points_earned())
+		Task.objects.all().delete()
+		self.assertEqual(0, self.factories.alex.points_earned())
+
+	def test_points_ledger_matches_with_points(self):
+		for child in Child.objects.with_points():
+			self.assertEqual(child.total_points, child.points)
+
+	def test_with_points(self):
+		with self.assertNumQueries(1):
+			children = list(Child.objects.with_points().alphabetical())
+			self.assertEqual(list(map(lambda child: child.points_earned(), children)), [4, 1, 0])
+
 	def test_alphabetical(self):
 		self.assertEqual(list(map(lambda child: child.first_name, Child.objects.alphabetical())), ["Alex", "Mark", "Rachel"])
 
 	def test_active(self):
-		self.assertEqual(list(map(lambda child: child.first_name, Child.objects.active().alphabetical())), ["Alex", "Mark"])
\ No newline at end of file
+		self.assertEqual(list(map(lambda child: child.first_name, Child.objects.active().alphabetical())), ["Alex", "Mark"])
+
+	def test_search(self):
+		ChildFactory.create(first_name="Heidi", last_name="Zimmer")
+		self.assertEqual(list(map(lambda child: child.first_name, Child.objects.search("he").alphabetical())), ["Alex", "Mark", "Rachel", "Heidi"])
+		self.assertEqual(list(map(lambda child: child.first_name, Child.objects.search("Ma").alphabetical())), ["Mark"])
+		self.assertEqual(list(Child.objects.search("Marz")), [])
+
+	def test_points_ledger_follows_archived_tasks(self):
+		Chore.objects.archive()
+		self.factories.shovel.points = 10
+		self.factories.shovel.save()
+		self.assertEqual(11, self.factories.alex.points_earned())
+		self.factories.dishes.delete()
+		self.assertEqual(10, self.factories.alex.points_earned())
+		Task.objects.all().delete()
+		self.assertEqual(0, self.factories.alex.points_earned())
+		self.assertFalse(ArchivedChore.objects.exists())
+
+	@override_settings(CHORES_DELETE_BATCH_SIZE=1)
+	def test_delete_in_batches(self):
+		alex = self.factories.alex
+		Chore.objects.filter(pk=self.factories.ac3.pk).archive()
+		with self.assertLogs("chores.deletion", "INFO") as logs:
+			alex.delete()
+		self.assertIn("Deleted 3 chores so far", logs.output[-2])
+		self.assertIn("Deleted 1 archived chores so far", logs.output[-1])
+		self.assertFalse(Chore.objects.filter(child_id=self.factories.alex.pk).exists())
+		self.assertFalse(ArchivedChore.objects.exists())
+		self.assertEqual(1, self.factories.mark.points_earned())
+
+	@override_settings(CHORES_DELETE_BATCH_SIZE=1)
+	def test_interrupted_delete_refreshes_ledger(self):
+		delete = Chore.QuerySet.delete
+		batches = []
+		def interrupt(queryset, **options):
+			batches.append(queryset)
+			if len(batches) == 3:
+				raise OperationalError("canceling statement due to statement timeout")
+			return delete(queryset, **options)
+		with mock.patch.object(Chore.QuerySet, "delete", autospec=True, side_effect=interrupt):
+			with self.assertRaises(OperationalError):
+				self.factories.alex.delete()
+		alex = Child.objects.with_points().get(pk=self.factories.alex.pk)
+		self.assertEqual(2, alex.chore_set.count())
+		self.assertEqual(alex.total_points, alex.points)
+
+	@override_settings(CHORES_DELETE_BATCH_SIZE=1)
+	def test_delete_does_not_refresh_own_ledger(self):
+		Chore.objects.filter(pk=self.factories.ac3.pk).archive()
+		with mock.patch.object(Child.QuerySet, "refresh_points") as refresh_points:
+			self.factories.alex.delete()
+			Child.objects.filter(pk=self.factories.mark.pk).delete()
+		refresh_points.assert_not_called()
+		self.assertFalse(Chore.objects.exists())
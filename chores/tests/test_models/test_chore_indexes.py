@@ -0,0 +1,106 @@
+from django.utils import timezone
+
+from chores.models import *
+from chores.explain import disable_seq_scans, explain, full_table_scans, index_seeks, sorts
+from chores.pagination import KeysetPaginator
+from chores.tests.utilities import *
+
+
+# EXPLAIN-based index checks for the Chore scopes.
+#
+# Each test asks the database for the query plan of a scope and fails if the
+# plan reads chores_chore without an index. On PostgreSQL sequential scans are
+# switched off first, since the planner would otherwise scan the tiny test
+# tables whatever the indexes. Run them on their own with
+#
+#   python manage.py test chores.tests.test_models.test_chore_indexes
+#
+# and print a plan while tuning with explain(Chore.objects.done()) from
+# chores.explain in `manage.py shell`.
+class ChoreIndexTests(FactoryTestCase):
+	populate = "populate_chores"
+
+	def setUp(self):
+		disable_seq_scans()
+
+	def assertUsesIndex(self, queryset, index):
+		plan = explain(queryset)
+		self.assertEqual(full_table_scans(plan, "chores_chore"), [], plan)
+		self.assertTrue(any(index in line for line in plan), plan)
+
+	# The after and before queries of a list page seek into the index and read it in order
+	def assertSeeks(self, queryset, keys, table, index):
+		paginator = KeysetPaginator(queryset, keys, 25)
+		values = paginator.keys_for(paginator.ordered()[1])
+		for rows in (paginator.rows_after(values), paginator.rows_before(values)):
+			plan = explain(rows[:26])
+			self.assertEqual(full_table_scans(plan, table), [], plan)
+			self.assertNotEqual(index_seeks(plan, index), [], plan)
+			self.assertEqual(sorts(plan), [], plan)
+
+	def test_done(self):
+		self.assertUsesIndex(Chore.objects.done(), "chore_completed_due_on_idx")
+
+	def test_pending(self):
+		self.assertUsesIndex(Chore.objects.pending(), "chore_completed_due_on_idx")
+
+	def test_upcoming(self):
+		self.assertUsesIndex(Chore.objects.upcoming(), "chore_due_on_idx")
+
+	def test_past(self):
+		self.assertUsesIndex(Chore.objects.past(), "chore_due_on_idx")
+
+	def test_due_between(self):
+		self.assertUsesIndex(Chore.objects.due_between(timezone.localdate(), timezone.localdate()), "chore_due_on_idx")
+
+	def test_chronological(self):
+		self.assertUsesIndex(Chore.objects.chronological(), "chore_list_idx")
+
+	def test_chore_list_pages(self):
+		self.assertSeeks(Chore.objects.chronological(), ("due_on", "task_name", "id"), "chores_chore", "chore_list_idx")
+
+	def test_archived_chore_list_pages(self):
+		Chore.objects.archive()
+		self.assertSeeks(ArchivedChore.objects.chronological(), ("due_on", "id"), "chores_archivedchore", "archive_due_on_idx")
+
+	def test_child_list_pages(self):
+		self.assertSeeks(Child.objects.alphabetical(), ("last_name", "first_name", "id"), "chores_child", "child_name_idx")
+
+	def test_task_list_pages(self):
+		self.assertSeeks(Task.objects.alphabetical(), ("name", "id"), "chores_task", "task_name_idx")
+
+	def test_child_done(self):
+		self.assertUsesIndex(self.factories.alex.chore_set.done(), "chore_child_completed_idx")
+
+	def test_child_stats(self):
+		# The columns stats() aggregates over
+		plan = explain(self.factories.alex.chore_set.order_by().values("completed", "due_on"))
+		self.assertEqual(full_table_scans(plan, "chores_chore"), [], plan)
+
+	def test_child_recent(self):
+		self.assertUsesIndex(self.factories.alex.chore_set.recent(), "chore_child_due_on_idx")
+
+	def test_task_usage(self):
+		self.assertUsesIndex(Chore.objects.filter(task=self.factories.dishes).values("completed", "due_on"), "chore_task_completed_idx")
+		self.assertUsesIndex(Chore.objects.filter(task=self.factories.dishes, completed=True).values("child_id"), "chore_task_completed_idx")
+
+	def test_child_search(self):
+		plan = explain(Child.objects.active().search("he"))
+		self.assertEqual(full_table_scans(plan, "chores_child"), [], plan)
+		self.assertTrue(any("child_name_idx" in line for line in plan), plan)
+		self.assertTrue(any("child_first_name_idx" in line for line in plan), plan)
+
+	def test_task_search(self):
+		plan = explain(Task.objects.active().search("sw"))
+		self.assertEqual(full_table_scans(plan, "chores_task"), [], plan)
+		self.assertTrue(any("task_name_idx" in line for line in plan), plan)
+
+	def test_points_total(self):
+		plan = explain(Child.objects.with_points())
+		self.assertEqual(full_table_scans(plan, "chores_chore"), [], plan)
+		self.assertTrue(any("chore_child_completed_idx" in line for line in plan), plan)
+
+	def test_refresh_points(self):
+		plan = explain(Child.objects.filter(pk__in=[self.factories.alex.pk]).annotate(total=points_total()))
+		self.assertEqual(full_table_scans(plan, "chores_child"), [], plan)
+		self.assertTrue(any("chore_child_completed_idx" in line for line in plan), plan)
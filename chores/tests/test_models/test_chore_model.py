@@ -1,4 +1,8 @@
+import datetime
+from unittest import mock
+
 from django.core.exceptions import ValidationError
+from django.test import override_settings
 from django.utils import timezone
 
 from chores.models import *
@@ -6,12 +10,12 @@ from chores.tests.utilities import *
 
 
 class ChoreTests(FactoryTestCase):
-
-	def setUp(self):
-		self.factories.populate_chores()
+	populate = "populate_chores"
 
 	def test_by_task(self):
 		self.assertEqual(list(map(lambda chore: chore.task.name, Chore.objects.by_task())), ["Shovel driveway","Sweep floor","Sweep floor","Sweep floor", "Wash dishes","Wash dishes","Wash dishes"])
+		# From the chores' copy of the name, without sorting on the joined task
+		self.assertEqual(["task_name"], list(Chore.objects.by_task().query.order_by))
 
 	def test_chronological(self):
 		self.assertEqual(list(map(lambda chore: chore.task.name, Chore.objects.chronological())), ["Shovel driveway","Sweep floor","Wash dishes","Sweep floor","Wash dishes","Sweep floor","Wash dishes"])
@@ -28,8 +32,58 @@ class ChoreTests(FactoryTestCase):
 	def test_past(self):
 		self.assertEqual(1, len(Chore.objects.past()))
 
+	def test_upcoming_and_past_use_local_date(self):
+		Chore.objects.all().delete()
+		ChoreFactory.create(due_on=datetime.date(2026, 1, 1))
+		# 12:00 UTC on January 1st is already January 2nd in Kiribati
+		with mock.patch("django.utils.timezone.now", return_value=datetime.datetime(2026, 1, 1, 12, tzinfo=timezone.utc)):
+			self.assertEqual(1, Chore.objects.upcoming().count())
+			with override_settings(TIME_ZONE="Pacific/Kiritimati"):
+				self.assertEqual(0, Chore.objects.upcoming().count())
+				self.assertEqual(1, Chore.objects.past().count())
+
+	def test_due_between(self):
+		today = timezone.localdate()
+		self.assertEqual(3, Chore.objects.due_between(today - timezone.timedelta(days=2), today).count())
+		self.assertEqual(4, Chore.objects.due_between(today + timezone.timedelta(days=1), today + timezone.timedelta(days=2)).count())
+
 	def test_status_completed(self):
 		self.assertEqual("Completed", self.factories.ac3.status())
 
 	def test_status_pending(self):
-		self.assertEqual("Pending", self.factories.mc1.status())
\ No newline at end of file
+		self.assertEqual("Pending", self.factories.mc1.status())
+
+	def test_task_name(self):
+		self.assertEqual("Wash dishes", Chore.objects.get(pk=self.factories.ac1.pk).task_name)
+		self.factories.ac1.task = self.factories.shovel
+		self.factories.ac1.save()
+		self.assertEqual("Shovel driveway", Chore.objects.get(pk=self.factories.ac1.pk).task_name)
+		Chore.objects.bulk_create([Chore(child=self.factories.mark, task=self.factories.mow, due_on=timezone.localdate())])
+		self.assertEqual("Mow grass", Chore.objects.get(task=self.factories.mow).task_name)
+		self.factories.sweep.name = "Sweep porch"
+		self.factories.sweep.save()
+		self.assertEqual(["Sweep porch"] * 3, [chore.task_name for chore in self.factories.sweep.chore_set.all()])
+
+	def test_task_name_through_update(self):
+		self.assertEqual(1, Task.objects.filter(name="Sweep floor").update(name="Mop floor"))
+		self.assertEqual(["Mop floor"] * 3, [chore.task_name for chore in self.factories.sweep.chore_set.all()])
+		self.assertEqual(["Mop floor"] * 3 + ["Shovel driveway"], [chore.task.name for chore in Chore.objects.by_task()][:4])
+		Chore.objects.filter(pk=self.factories.ac1.pk).update(task=self.factories.shovel)
+		self.assertEqual("Shovel driveway", Chore.objects.get(pk=self.factories.ac1.pk).task_name)
+		Chore.objects.filter(pk=self.factories.ac1.pk).update(task_id=self.factories.mow.pk)
+		self.assertEqual("Mow grass", Chore.objects.get(pk=self.factories.ac1.pk).task_name)
+
+	def test_archive(self):
+		self.assertEqual(3, Chore.objects.archive())
+		self.assertEqual(0, Chore.objects.done().count())
+		self.assertEqual(4, Chore.objects.count())
+		archived = ArchivedChore.objects.chronological().get(task=self.factories.shovel)
+		self.assertEqual(self.factories.alex, archived.child)
+		self.assertEqual(self.factories.ac3.due_on.date(), archived.due_on)
+
+	def test_archive_keeps_points(self):
+		Chore.objects.filter(child=self.factories.alex).archive()
+		self.assertEqual(4, self.factories.alex.points_earned())
+		self.assertEqual(1, self.factories.mark.points_earned())
+		for child in Child.objects.with_points():
+			self.assertEqual(child.total_points, child.points)
@@ -0,0 +1,49 @@
+import datetime
+
+from django.core.exceptions import ValidationError
+
+from chores.models import *
+from chores.tests.utilities import *
+
+
+class RecurringChoreTests(FactoryTestCase):
+	populate = "populate_chores"
+
+	def test_days(self):
+		schedule = RecurringChore(child=self.factories.alex, task=self.factories.mow, rule="FREQ=WEEKLY;BYDAY=SA", starts_on=datetime.date(2030, 1, 1))
+		self.assertEqual([datetime.date(2030, 1, 5), datetime.date(2030, 1, 12)], schedule.days(datetime.date(2029, 12, 1), datetime.date(2030, 1, 12)))
+
+	def test_days_with_times(self):
+		schedule = RecurringChore(rule="FREQ=DAILY;BYHOUR=18", starts_on=datetime.date(2030, 1, 1))
+		self.assertEqual([datetime.date(2030, 1, 2), datetime.date(2030, 1, 3)], schedule.days(datetime.date(2030, 1, 2), datetime.date(2030, 1, 3)))
+
+	def test_days_from_next_on(self):
+		schedule = RecurringChore.objects.create(child=self.factories.alex, task=self.factories.mow, rule="FREQ=WEEKLY;INTERVAL=2", starts_on=datetime.date(2030, 1, 1))
+		self.assertEqual(datetime.date(2030, 1, 1), schedule.next_on)
+		schedule.materialized_through = datetime.date(2030, 3, 1)
+		schedule.next_on = schedule.next_day(datetime.date(2030, 3, 2))
+		self.assertEqual(datetime.date(2030, 3, 12), schedule.next_on)
+		# The rule starts on next_on, in the same fortnightly phase
+		self.assertEqual(datetime.date(2030, 3, 12), schedule.recurrence(datetime.date(2030, 3, 2))._dtstart.date())
+		self.assertEqual([datetime.date(2030, 3, 12), datetime.date(2030, 3, 26), datetime.date(2030, 4, 9)], schedule.days(datetime.date(2030, 3, 2), datetime.date(2030, 4, 9)))
+
+	def test_days_with_count(self):
+		schedule = RecurringChore.objects.create(child=self.factories.alex, task=self.factories.mow, rule="FREQ=DAILY;COUNT=3", starts_on=datetime.date(2030, 1, 1))
+		schedule.materialized_through = datetime.date(2030, 1, 1)
+		schedule.next_on = datetime.date(2030, 1, 2)
+		self.assertEqual(datetime.date(2030, 1, 1), schedule.recurrence(datetime.date(2030, 1, 2))._dtstart.date())
+		self.assertEqual([datetime.date(2030, 1, 2), datetime.date(2030, 1, 3)], schedule.days(datetime.date(2030, 1, 2), datetime.date(2030, 1, 9)))
+		self.assertIsNone(schedule.next_day(datetime.date(2030, 1, 4)))
+
+	def test_validate_rule(self):
+		schedule = RecurringChore(child=self.factories.alex, task=self.factories.mow, rule="FREQ=SOMETIMES")
+		with self.assertRaises(ValidationError):
+			schedule.full_clean()
+		schedule.rule = "FREQ=DAILY;INTERVAL=2"
+		schedule.full_clean()
+
+	def test_deleting_schedule_keeps_chores(self):
+		schedule = RecurringChore.objects.create(child=self.factories.alex, task=self.factories.mow, rule="FREQ=DAILY")
+		chore = ChoreFactory.create(child=self.factories.alex, task=self.factories.mow, schedule=schedule)
+		schedule.delete()
+		self.assertIsNone(Chore.objects.get(pk=chore.pk).schedule)
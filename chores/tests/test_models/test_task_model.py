@@ -1,4 +1,5 @@
 from django.core.exceptions import ValidationError
+from django.test import override_settings
 from django.utils import timezone
 
 from chores.models import *
@@ -6,9 +7,7 @@ from chores.tests.utilities import *
 
 
 class TaskTests(FactoryTestCase):
-
-	def setUp(self):
-		self.factories.populate_tasks()
+	populate = "populate_tasks"
 
 	def test_validate_name(self):
 		with self.assertRaises(ValidationError):
@@ -24,4 +23,34 @@ class TaskTests(FactoryTestCase):
 		self.assertEqual(list(map(lambda task: task.name, Task.objects.alphabetical())), ["Mow grass", "Shovel driveway", "Stack wood", "Sweep floor", "Wash dishes"])
 
 	def test_active(self):
-		self.assertEqual(list(map(lambda task: task.name, Task.objects.active().alphabetical())), ["Mow grass", "Shovel driveway", "Sweep floor", "Wash dishes"])
\ No newline at end of file
+		self.assertEqual(list(map(lambda task: task.name, Task.objects.active().alphabetical())), ["Mow grass", "Shovel driveway", "Sweep floor", "Wash dishes"])
+
+	def test_search(self):
+		self.assertEqual(list(map(lambda task: task.name, Task.objects.search("S").alphabetical())), ["Shovel driveway", "Stack wood", "Sweep floor"])
+		self.assertEqual(list(map(lambda task: task.name, Task.objects.search("sw").alphabetical())), ["Sweep floor"])
+		self.assertEqual(list(Task.objects.search("Sweepx")), [])
+		self.assertEqual(Task.objects.search("").count(), 5)
+
+
+class TaskDeleteTests(FactoryTestCase):
+	populate = "populate_chores"
+
+	@override_settings(CHORES_DELETE_BATCH_SIZE=1)
+	def test_delete_in_batches(self):
+		Chore.objects.filter(pk=self.factories.ac4.pk).archive()
+		with self.assertLogs("chores.deletion", "INFO") as logs:
+			self.factories.dishes.delete()
+		self.assertEqual(["Deleted 1 chores so far", "Deleted 2 chores so far", "Deleted 1 archived chores so far"],
+			[record.getMessage() for record in logs.records])
+		self.assertEqual(4, Chore.objects.count())
+		self.assertEqual(3, self.factories.alex.points_earned())
+		self.assertEqual(1, self.factories.mark.points_earned())
+
+	@override_settings(CHORES_DELETE_BATCH_SIZE=2)
+	def test_queryset_delete_in_batches(self):
+		Task.objects.filter(pk__in=[self.factories.sweep.pk, self.factories.shovel.pk]).delete()
+		self.assertEqual(3, Chore.objects.count())
+		self.assertEqual(1, self.factories.alex.points_earned())
+		self.assertEqual(0, self.factories.mark.points_earned())
+		for child in Child.objects.with_points():
+			self.assertEqual(child.total_points, child.points)
@@ -1,3 +1,6 @@
 from .test_child_views import *
 from .test_task_views import *
-from .test_chore_views import *
\ No newline at end of file
+from .test_chore_views import *
+from .test_metrics_views import *
+from .test_replica_views import *
+from .test_statement_timeout_views import *
\ No newline at end of file
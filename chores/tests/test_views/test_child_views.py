@@ -1,17 +1,19 @@
+import time
+
 from django.test import RequestFactory
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
 
 from chores.models import *
 from chores.forms import *
 from chores.views import *
+from chores import leaderboard
 from chores.tests.utilities import *
 
 
 class ChildViewTests(FactoryTestCase):
-    
-    def setUp(self):
-        self.factories.populate_children()
+    populate = "populate_children"
 
     def test_list_view_with_no_children(self):
         Child.objects.all().delete()
@@ -28,6 +30,70 @@ class ChildViewTests(FactoryTestCase):
         self.assertQuerysetEqual(list(response.context['children']), 
             [repr(self.factories.alex), repr(self.factories.mark), repr(self.factories.rachel)])
 
+    def test_list_view_pages(self):
+        response = self.client.get(reverse('chores:child_list'), {'per_page': 2})
+        self.assertEqual(list(response.context['children']), [self.factories.alex, self.factories.mark])
+        response = self.client.get(reverse('chores:child_list') + '?' + response.context['page'].next_query)
+        self.assertEqual(list(response.context['children']), [self.factories.rachel])
+
+    def test_list_view_shows_points(self):
+        ChoreFactory.create(child=self.factories.alex, task=TaskFactory.create(points=3), completed=True)
+        response = self.client.get(reverse('chores:child_list'))
+        self.assertContains(response, "3 points")
+        self.assertEqual(response.context['children'][0].points_earned(), 3)
+
+    def test_list_view_cache_follows_points(self):
+        self.assertContains(self.client.get(reverse('chores:child_list')), "0 points", count=3)
+        chore = ChoreFactory.create(child=self.factories.alex, task=TaskFactory.create(points=3))
+        chore.completed = True
+        chore.save()
+        self.assertContains(self.client.get(reverse('chores:child_list')), "3 points")
+
+    def test_list_view_cache_follows_archived_points(self):
+        ChoreFactory.create(child=self.factories.alex, task=TaskFactory.create(points=3), completed=True)
+        Chore.objects.archive()
+        response = self.client.get(reverse('chores:child_list'))
+        self.assertContains(response, "3 points")
+        ArchivedChore.objects.all().delete()
+        changed = self.client.get(reverse('chores:child_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, "0 points", count=3)
+
+    def test_list_view_not_modified(self):
+        response = self.client.get(reverse('chores:child_list'))
+        repeat = self.client.get(reverse('chores:child_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.templates, [])
+        ChoreFactory.create(child=self.factories.alex, completed=True)
+        changed = self.client.get(reverse('chores:child_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, "1 points")
+
+    def test_detail_view_not_modified_after_message(self):
+        response = self.client.post(reverse('chores:child_edit', args=(self.factories.alex.id,)),
+            {'first_name': 'Batman', 'last_name': 'Heimann', 'active': True})
+        url = reverse('chores:child_detail', args=(self.factories.alex.id,))
+        self.assertFalse(self.client.get(url).has_header('ETag'))
+        etag = self.client.get(url)['ETag']
+        self.client.post(reverse('chores:child_new'), {'first_name': 'Connor', 'last_name': 'Hanley', 'active': True})
+        # A pending flash message means the page must be sent in full
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_search_view(self):
+        ChildFactory.create(first_name="Heidi", last_name="Zimmer")
+        response = self.client.get(reverse('chores:child_search'), {'q': 'he'})
+        self.assertEqual(response.status_code, 200)
+        # Rachel is inactive
+        self.assertEqual([result['text'] for result in response.json()['results']],
+            ["Alex Heimann", "Mark Heimann", "Heidi Zimmer"])
+        self.assertEqual(response.json()['results'][0]['id'], self.factories.alex.id)
+
+    def test_search_view_limit(self):
+        with self.settings(CHORES_AUTOCOMPLETE_LIMIT=1):
+            response = self.client.get(reverse('chores:child_search'), {'q': 'H'})
+        self.assertEqual(len(response.json()['results']), 1)
+
     def test_new_child_view(self):
         response = self.client.get(reverse('chores:child_new'))
         self.assertEqual(response.status_code, 200)
@@ -39,7 +105,7 @@ class ChildViewTests(FactoryTestCase):
         response = self.client.post(reverse('chores:child_new'),
             {'first_name': 'Connor', 'last_name': 'Hanley', 'active': True}) 
         self.assertEqual(Child.objects.count(), num_children + 1)
-        self.assertRedirects(response, reverse('chores:child_detail', args=(num_children+1,)))
+        self.assertRedirects(response, reverse('chores:child_detail', args=(Child.objects.latest('pk').pk,)))
 
     def test_create_bad_child_view(self):
         num_children = Child.objects.count()
@@ -77,3 +143,94 @@ class ChildViewTests(FactoryTestCase):
         response = self.client.post(reverse('chores:child_delete', args=(self.factories.alex.id,)))
         self.assertEqual(Child.objects.count(), num_children - 1)
         self.assertRedirects(response, reverse('chores:child_list'))
+
+
+class ChildLeaderboardTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def test_leaderboard_all_time(self):
+        ChoreFactory.create(child=self.factories.mark, task=self.factories.shovel, completed=True)
+        response = self.client.get(reverse('chores:child_leaderboard'), {'period': 'all'})
+        # Alex and Mark tie on 4 points; Rachel is inactive
+        self.assertEqual([(entry['rank'], entry['name'], entry['points']) for entry in response.context['board']],
+            [(1, "Alex Heimann", 4), (1, "Mark Heimann", 4)])
+        with self.assertNumQueries(0):
+            self.client.get(reverse('chores:child_leaderboard'), {'period': 'all'})
+
+    def test_leaderboard_week(self):
+        start = leaderboard.period_start('week')
+        alex = 1 + (3 if timezone.localdate() - timezone.timedelta(days=2) >= start else 0)
+        response = self.client.get(reverse('chores:child_leaderboard'), {'period': 'week', 'child': self.factories.mark.id})
+        self.assertEqual([(entry['name'], entry['points']) for entry in response.context['board']],
+            [("Alex Heimann", alex), ("Mark Heimann", 1)])
+        self.assertEqual(response.context['child_rank'], (2, 1))
+        self.assertContains(response, "Mark Heimann is ranked #2 with 1 points.")
+
+    def test_leaderboard_inactive_child_not_ranked(self):
+        response = self.client.get(reverse('chores:child_leaderboard'), {'period': 'all', 'child': self.factories.rachel.id})
+        self.assertIsNone(response.context['child_rank'])
+        self.assertContains(response, "Rachel Heimann is not ranked")
+        self.assertIsNone(leaderboard.rank_of(self.factories.rachel, 'week'))
+
+    def test_leaderboard_follows_points(self):
+        url = reverse('chores:child_leaderboard')
+        self.assertEqual(self.client.get(url, {'period': 'all', 'child': self.factories.mark.id}).context['child_rank'], (2, 1))
+        Chore.objects.filter(child=self.factories.mark).set_completed(True)
+        self.assertEqual(self.client.get(url, {'period': 'all', 'child': self.factories.mark.id}).context['child_rank'], (2, 3))
+        self.factories.sweep.points = 5
+        self.factories.sweep.save()
+        response = self.client.get(url, {'period': 'all'})
+        self.assertEqual([(entry['name'], entry['points']) for entry in response.context['board']],
+            [("Mark Heimann", 11), ("Alex Heimann", 4)])
+        self.factories.mark.active = False
+        self.factories.mark.save()
+        response = self.client.get(url, {'period': 'all'})
+        self.assertEqual([entry['name'] for entry in response.context['board']], ["Alex Heimann"])
+
+    def test_leaderboard_moves_with_due_dates(self):
+        url = reverse('chores:child_leaderboard')
+        self.assertEqual(self.client.get(url, {'period': 'week', 'child': self.factories.mark.id}).context['child_rank'][1], 1)
+        self.factories.mc3.due_on = timezone.localdate() - timezone.timedelta(days=60)
+        self.factories.mc3.save()
+        self.assertEqual(self.client.get(url, {'period': 'week', 'child': self.factories.mark.id}).context['child_rank'][1], 0)
+
+    def test_leaderboard_bad_period(self):
+        self.assertEqual(self.client.get(reverse('chores:child_leaderboard'), {'period': 'year'}).status_code, 404)
+
+
+class ChildDetailStatsTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def test_detail_view_stats(self):
+        ChoreFactory.create(child=self.factories.alex, task=self.factories.mow, due_on=timezone.localdate() - timezone.timedelta(days=3))
+        response = self.client.get(reverse('chores:child_detail', args=(self.factories.alex.id,)))
+        self.assertEqual(response.context['stats'], {'pending': 3, 'overdue': 1, 'completed': 2})
+        self.assertContains(response, '<span id="child-points">4</span>', html=True)
+        self.assertEqual([chore.task for chore in response.context['recent_chores']],
+            [self.factories.dishes, self.factories.shovel, self.factories.mow])
+
+    def test_detail_view_query_budget(self):
+        for i in range(30):
+            ChoreFactory.create(child=self.factories.alex, task=self.factories.mow, due_on=timezone.localdate() - timezone.timedelta(days=i))
+        # The ETag state, the child, the counts and the recent chores with their tasks
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('chores:child_detail', args=(self.factories.alex.id,)))
+        self.assertEqual(len(response.context['recent_chores']), 10)
+
+    def test_detail_view_if_modified_since_follows_chores(self):
+        url = reverse('chores:child_detail', args=(self.factories.mark.id,))
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        ChoreFactory.create(child=self.factories.mark, task=self.factories.mow)
+        changed = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.context['stats']['pending'], response.context['stats']['pending'] + 1)
+
+    def test_detail_view_not_modified_follows_chores(self):
+        url = reverse('chores:child_detail', args=(self.factories.mark.id,))
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Chore.objects.filter(child=self.factories.mark).set_completed(True)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.context['stats']['pending'], 0)
@@ -1,6 +1,15 @@
-from django.test import RequestFactory
+import csv
+import datetime
+import json
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
 
 from chores.models import *
 from chores.forms import *
@@ -9,9 +18,7 @@ from chores.tests.utilities import *
     
 
 class ChoreViewTests(FactoryTestCase):
-
-    def setUp(self):
-        self.factories.populate_chores()
+    populate = "populate_chores"
 
     def test_list_view_with_no_chores(self):
         Chore.objects.all().delete()
@@ -28,18 +35,199 @@ class ChoreViewTests(FactoryTestCase):
         self.assertQuerysetEqual(list(response.context['chores']), 
             [repr(self.factories.ac3),repr(self.factories.mc3),repr(self.factories.ac4),repr(self.factories.mc1),repr(self.factories.ac1),repr(self.factories.ac2),repr(self.factories.mc2)])
 
+    def test_list_view_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('chores:chore_list'), {'per_page': 100})
+        for i in range(20):
+            ChoreFactory.create()
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse('chores:chore_list'), {'per_page': 100})
+        self.assertEqual(len(response.context['chores']), 27)
+        self.assertEqual(len(few), len(many))
+
+    def test_list_view_pages(self):
+        expected = [self.factories.ac3, self.factories.mc3, self.factories.ac4, self.factories.mc1,
+            self.factories.ac1, self.factories.ac2, self.factories.mc2]
+        response = self.client.get(reverse('chores:chore_list'), {'per_page': 3})
+        self.assertEqual(list(response.context['chores']), expected[:3])
+        self.assertFalse(response.context['page'].has_previous)
+        self.assertContains(response, 'id="page-next"')
+
+        page = response.context['page']
+        response = self.client.get(reverse('chores:chore_list') + '?' + page.next_query)
+        self.assertEqual(list(response.context['chores']), expected[3:6])
+
+        page = response.context['page']
+        response = self.client.get(reverse('chores:chore_list') + '?' + page.next_query)
+        self.assertEqual(list(response.context['chores']), expected[6:])
+        self.assertFalse(response.context['page'].has_next)
+
+        page = response.context['page']
+        response = self.client.get(reverse('chores:chore_list') + '?' + page.previous_query)
+        self.assertEqual(list(response.context['chores']), expected[3:6])
+        self.assertTrue(response.context['page'].has_previous)
+
+    def test_list_view_cache_ignores_other_parameters(self):
+        self.client.get(reverse('chores:chore_list'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('chores:chore_list'), {'x': '1'})
+            self.client.get(reverse('chores:chore_list'), {'x': '2', 'y': '3'})
+        page = self.client.get(reverse('chores:chore_list'), {'per_page': 3}).context['page']
+        self.assertEqual(page.cache_key, "per_page=3")
+        self.assertNotEqual(self.client.get(reverse('chores:chore_list') + '?' + page.next_query).context['page'].cache_key,
+            page.cache_key)
+
+    def test_list_view_bad_cursor(self):
+        response = self.client.get(reverse('chores:chore_list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_view_is_cached(self):
+        self.client.get(reverse('chores:chore_list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('chores:chore_list'))
+        self.assertContains(response, "Alex Heimann - Wash dishes")
+
+    def test_list_view_cache_invalidation(self):
+        self.client.get(reverse('chores:chore_list'))
+        self.factories.alex.first_name = "Alexandra"
+        self.factories.alex.save()
+        self.assertContains(self.client.get(reverse('chores:chore_list')), "Alexandra Heimann - Wash dishes")
+        self.factories.dishes.name = "Dry dishes"
+        self.factories.dishes.save()
+        self.assertContains(self.client.get(reverse('chores:chore_list')), "Alexandra Heimann - Dry dishes")
+        ac1_id = self.factories.ac1.id
+        self.factories.ac1.delete()
+        response = self.client.get(reverse('chores:chore_list'))
+        self.assertNotContains(response, 'value="%d"' % ac1_id)
+        Chore.objects.pending().set_completed(True)
+        self.assertNotContains(self.client.get(reverse('chores:chore_list')), "Pending")
+
+    def test_detail_view_loads_related_in_one_query(self):
+        # One query for the ETag state, one for the chore with its child and task
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('chores:chore_detail', args=(self.factories.ac1.id,)))
+        self.assertContains(response, "Alex Heimann - Wash dishes")
+
+    def test_list_view_not_modified(self):
+        response = self.client.get(reverse('chores:chore_list'))
+        self.assertTrue(response.has_header('ETag'))
+        # The state counts rows, so only the ETag can tell a delete apart
+        self.assertFalse(response.has_header('Last-Modified'))
+        repeat = self.client.get(reverse('chores:chore_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.templates, [])
+
+        self.factories.dishes.name = "Dry dishes"
+        self.factories.dishes.save()
+        changed = self.client.get(reverse('chores:chore_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+        self.factories.ac1.delete()
+        deleted = self.client.get(reverse('chores:chore_list'), HTTP_IF_NONE_MATCH=changed['ETag'])
+        self.assertEqual(deleted.status_code, 200)
+
+    def test_list_view_if_modified_since_after_delete(self):
+        url = reverse('chores:chore_detail', args=(self.factories.ac1.id,))
+        self.assertContains(self.client.get(reverse('chores:chore_list')), 'href="%s"' % url)
+        self.factories.ac1.delete()
+        deleted = self.client.get(reverse('chores:chore_list'), HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(deleted.status_code, 200)
+        self.assertNotContains(deleted, 'href="%s"' % url)
+
+    def test_detail_view_not_modified(self):
+        url = reverse('chores:chore_detail', args=(self.factories.ac1.id,))
+        response = self.client.get(url)
+        with self.assertNumQueries(1):
+            repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.templates, [])
+        # Only row timestamps make up the state, so Last-Modified is sent and honoured
+        repeat = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(repeat.status_code, 304)
+        self.factories.alex.first_name = "Alexandra"
+        self.factories.alex.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_agenda_view_groups_by_day_and_child(self):
+        today = timezone.localdate()
+        # Three queries for the ETag state, one for the chores of the week
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('chores:chore_agenda'), {'start': today.isoformat()})
+        agenda = response.context['agenda']
+        self.assertEqual(len(agenda.days), 7)
+        self.assertEqual(agenda.start.weekday(), 0)
+        day = agenda.days[(today - agenda.start).days]
+        self.assertEqual(day.date, today)
+        self.assertEqual([child.name for child in day.children], ["Alex Heimann", "Mark Heimann"])
+        self.assertEqual([chore['task_name'] for chore in day.children[0].chores], ["Wash dishes"])
+        self.assertTrue(day.children[0].chores[0]['completed'])
+        self.assertContains(response, "Wash dishes")
+
+    @override_settings(CHORES_AGENDA_CHILDREN_PER_DAY=1, CHORES_AGENDA_CHORES_PER_CHILD=1)
+    def test_agenda_view_caps_rows(self):
+        today = timezone.localdate()
+        mow = ChoreFactory.create(child=self.factories.alex, task=self.factories.mow, due_on=today)
+        response = self.client.get(reverse('chores:chore_agenda'), {'start': today.isoformat()})
+        agenda = response.context['agenda']
+        day = agenda.days[(today - agenda.start).days]
+        self.assertEqual([child.name for child in day.children], ["Alex Heimann"])
+        self.assertEqual(day.more_children, 1)
+        self.assertEqual([chore['task_name'] for chore in day.children[0].chores], ["Mow grass"])
+        self.assertEqual(day.children[0].more_chores, 1)
+        self.assertContains(response, "1 more children")
+        self.assertContains(response, 'href="%s">1 more</a>' % reverse('chores:child_detail', args=(self.factories.alex.id,)))
+        self.assertContains(response, 'href="%s"' % reverse('chores:chore_detail', args=(mow.id,)))
+        self.assertNotContains(response, 'href="%s"' % reverse('chores:chore_detail', args=(self.factories.ac4.id,)))
+
+    def test_agenda_view_month(self):
+        response = self.client.get(reverse('chores:chore_agenda'), {'span': 'month', 'start': '2024-02-10'})
+        agenda = response.context['agenda']
+        self.assertEqual((agenda.start, agenda.end), (datetime.date(2024, 2, 1), datetime.date(2024, 2, 29)))
+        self.assertEqual(agenda.previous_start, datetime.date(2024, 1, 1))
+        self.assertEqual(agenda.next_start, datetime.date(2024, 3, 1))
+        self.assertEqual(len(agenda.days), 29)
+        self.assertFalse(any(day.children for day in agenda.days))
+
+    def test_agenda_view_is_cached(self):
+        url = reverse('chores:chore_agenda')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.factories.ac4.completed = False
+        self.factories.ac4.save()
+        agenda = self.client.get(url).context['agenda']
+        alex = agenda.days[(timezone.localdate() - agenda.start).days].children[0]
+        self.assertFalse(alex.chores[0]['completed'])
+
+    def test_agenda_view_bad_start(self):
+        response = self.client.get(reverse('chores:chore_agenda'), {'start': 'tomorrow'})
+        self.assertEqual(response.status_code, 400)
+
     def test_new_chore_view(self):
         response = self.client.get(reverse('chores:chore_new'))
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.context['form'], ChoreForm)
         self.assertContains(response, "Create Chore")
 
+    def test_new_chore_view_does_not_list_children_or_tasks(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('chores:chore_new'))
+        self.assertNotContains(response, "Heimann")
+        self.assertNotContains(response, "Shovel driveway")
+        self.assertContains(response, reverse('chores:child_search'))
+
+    def test_edit_chore_view_shows_selection(self):
+        response = self.client.get(reverse('chores:chore_edit', args=(self.factories.ac3.id,)))
+        self.assertContains(response, 'value="Alex Heimann"')
+        self.assertContains(response, 'value="Shovel driveway"')
+        self.assertNotContains(response, "Mark Heimann")
+
     def test_create_chore_view(self):
         num_chores = Chore.objects.count()
         response = self.client.post(reverse('chores:chore_new'),
             {'child': self.factories.alex.id, 'task': self.factories.shovel.id, 'due_on': timezone.now().date() + timezone.timedelta(days=3), 'completed': False}) 
         self.assertEqual(Chore.objects.count(), num_chores + 1)
-        self.assertRedirects(response, reverse('chores:chore_detail', args=(num_chores+1,)))
+        self.assertRedirects(response, reverse('chores:chore_detail', args=(Chore.objects.latest('pk').pk,)))
 
     def test_create_bad_chore_view(self):
         num_chores = Chore.objects.count()
@@ -49,6 +237,147 @@ class ChoreViewTests(FactoryTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.context['form'], ChoreForm)
 
+    def test_new_bulk_chore_view(self):
+        response = self.client.get(reverse('chores:chore_bulk_new'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context['form'], ChoreBulkForm)
+
+    def test_new_bulk_chore_view_does_not_list_children_or_tasks(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('chores:chore_bulk_new'))
+        self.assertNotContains(response, "Heimann")
+        self.assertNotContains(response, "Shovel driveway")
+        self.assertContains(response, reverse('chores:task_search'))
+
+    def test_bulk_create_inactive_view(self):
+        num_chores = Chore.objects.count()
+        today = timezone.localdate()
+        response = self.client.post(reverse('chores:chore_bulk_new'),
+            {'children': [self.factories.alex.id, self.factories.rachel.id], 'tasks': [self.factories.wood.id],
+             'start_on': today, 'end_on': today})
+        self.assertEqual(Chore.objects.count(), num_chores)
+        self.assertEqual(set(response.context['form'].errors), {'children', 'tasks'})
+        # The valid selection is shown again, the inactive ones are not
+        self.assertContains(response, 'name="children" value="%d">Alex Heimann' % self.factories.alex.id)
+        self.assertNotContains(response, "Rachel")
+        self.assertNotContains(response, "Stack wood")
+
+    def test_bulk_create_chore_view(self):
+        num_chores = Chore.objects.count()
+        today = timezone.now().date()
+        # The lookups, one existing-chore check, one batched insert and one ledger update
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('chores:chore_bulk_new'),
+                {'children': [self.factories.alex.id, self.factories.mark.id],
+                 'tasks': [self.factories.sweep.id, self.factories.mow.id],
+                 'start_on': today, 'end_on': today + timezone.timedelta(days=2), 'completed': True})
+        self.assertRedirects(response, reverse('chores:chore_list'), fetch_redirect_response=False)
+        # mc3, mc1 and ac2 already exist
+        self.assertEqual(Chore.objects.count(), num_chores + 9)
+        self.assertEqual(self.factories.mark.points_earned(), 1 + 1 + 2 * 3)
+        response = self.client.get(reverse('chores:chore_list'))
+        self.assertContains(response, "Successfully created 9 chores (3 already existed)!")
+
+    def test_bulk_create_bad_range_view(self):
+        num_chores = Chore.objects.count()
+        today = timezone.now().date()
+        response = self.client.post(reverse('chores:chore_bulk_new'),
+            {'children': [self.factories.alex.id], 'tasks': [500],
+             'start_on': today, 'end_on': today - timezone.timedelta(days=1)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Chore.objects.count(), num_chores)
+        self.assertTrue(response.context['form'].errors)
+
+    def test_bulk_complete_chores_view(self):
+        selected = [self.factories.ac1.id, self.factories.ac2.id, self.factories.ac3.id]
+        with CaptureQueriesContext(connection) as three:
+            response = self.client.post(reverse('chores:chore_bulk_update'),
+                {'chores': selected, 'action': 'complete', 'next': reverse('chores:chore_list') + '?per_page=3'})
+        self.assertRedirects(response, reverse('chores:chore_list') + '?per_page=3', fetch_redirect_response=False)
+        self.assertEqual(Chore.objects.filter(pk__in=selected, completed=True).count(), 3)
+        self.assertEqual(self.factories.alex.points_earned(), 3 + 1 + 1 + 1)
+        response = self.client.get(reverse('chores:chore_list'))
+        self.assertContains(response, "Successfully marked 2 chores completed (1 already were)!")
+
+        selected = [chore.id for chore in Chore.objects.all()]
+        with CaptureQueriesContext(connection) as seven:
+            self.client.post(reverse('chores:chore_bulk_update'), {'chores': selected, 'action': 'pending'})
+        self.assertEqual(Chore.objects.done().count(), 0)
+        self.assertEqual(self.factories.alex.points_earned(), 0)
+        self.assertEqual(len(three), len(seven))
+
+    def test_bulk_update_nothing_selected_view(self):
+        response = self.client.post(reverse('chores:chore_bulk_update'), {'action': 'complete', 'next': 'http://evil.example.com/'})
+        self.assertRedirects(response, reverse('chores:chore_list'), fetch_redirect_response=False)
+        self.assertEqual(Chore.objects.done().count(), 3)
+
+    def test_export_csv_view(self):
+        response = self.client.get(reverse('chores:chore_export'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(lines[0], ['id', 'child', 'task', 'points', 'due_on', 'completed'])
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(lines[1], [str(self.factories.ac3.id), 'Alex Heimann', 'Shovel driveway', '3',
+            str(self.factories.ac3.due_on.date()), 'True'])
+
+    def test_export_ndjson_view_with_filters(self):
+        response = self.client.get(reverse('chores:chore_export'),
+            {'format': 'ndjson', 'child': self.factories.alex.id, 'status': 'pending'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.factories.ac1.id, self.factories.ac2.id])
+        self.assertEqual(rows[0]['child'], 'Alex Heimann')
+        self.assertFalse(rows[0]['completed'])
+
+    def test_export_bad_filter_view(self):
+        response = self.client.get(reverse('chores:chore_export'), {'start_on': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_archive_view(self):
+        response = self.client.get(reverse('chores:archived_chore_list'))
+        self.assertContains(response, "No chores have been archived.")
+        Chore.objects.archive()
+        response = self.client.get(reverse('chores:archived_chore_list'), {'per_page': 2})
+        self.assertEqual([chore.task for chore in response.context['chores']],
+            [self.factories.shovel, self.factories.dishes])
+        self.assertContains(response, 'id="page-next"')
+        self.assertNotContains(self.client.get(reverse('chores:chore_list')), "Shovel driveway")
+
+    def test_archive_view_cache_invalidation(self):
+        Chore.objects.filter(pk=self.factories.ac3.pk).archive()
+        self.client.get(reverse('chores:archived_chore_list'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('chores:archived_chore_list'))
+        self.factories.shovel.name = "Clear driveway"
+        self.factories.shovel.save()
+        self.assertContains(self.client.get(reverse('chores:archived_chore_list')), "Clear driveway")
+        Chore.objects.filter(pk=self.factories.mc3.pk).archive()
+        self.assertContains(self.client.get(reverse('chores:archived_chore_list')), "Sweep")
+
+    def test_import_view(self):
+        response = self.client.get(reverse('chores:chore_import'))
+        self.assertContains(response, 'enctype="multipart/form-data"')
+        upload = SimpleUploadedFile('chores.csv', b'\xef\xbb\xbfchild,task,due_on,completed\nRachel Heimann,Mow grass,2030-01-01,True\n')
+        response = self.client.post(reverse('chores:chore_import'), {'file': upload}, follow=True)
+        self.assertRedirects(response, reverse('chores:chore_list'))
+        self.assertContains(response, "Successfully imported 1 chores (0 already existed)!")
+        self.assertEqual(2, self.factories.rachel.points_earned())
+
+    def test_import_view_row_errors(self):
+        upload = SimpleUploadedFile('chores.csv', b'child,task,due_on\nRachel Heimann,Mow grass,2030-01-01\nNobody,Mow grass,2030-01-01\n')
+        response = self.client.post(reverse('chores:chore_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Successfully imported 1 chores (0 already existed)!")
+        self.assertContains(response, "Line 3: child: Select a valid choice.")
+
+    def test_import_view_bad_file(self):
+        upload = SimpleUploadedFile('chores.csv', b'name\nRachel\n')
+        response = self.client.post(reverse('chores:chore_import'), {'file': upload})
+        self.assertContains(response, "The file has no child, task, due_on column.")
+        self.assertEqual(Chore.objects.count(), 7)
+
     def test_edit_chore_view(self):
         response = self.client.get(reverse('chores:chore_edit', args=(self.factories.ac1.id,)))
         self.assertEqual(response.status_code, 200)
@@ -0,0 +1,45 @@
+import json
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from chores import metrics
+from chores.tests.utilities import *
+
+
+class MetricsViewTests(FactoryTestCase):
+
+    populate = "populate_chores"
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.staff = User.objects.create_user('parent', password='secret', is_staff=True)
+
+    def test_requires_staff(self):
+        response = self.client.get(reverse('chores:metrics'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(User.objects.create_user('kid', password='secret'))
+        self.assertEqual(self.client.get(reverse('chores:metrics')).status_code, 302)
+
+    def test_json_metrics(self):
+        self.client.get(reverse('chores:chore_list'))
+        self.client.get(reverse('chores:chore_detail', args=(self.factories.ac1.id,)))
+        self.client.get(reverse('chores:chore_detail', args=(self.factories.ac2.id,)))
+        self.client.force_login(self.staff)
+        data = json.loads(self.client.get(reverse('chores:metrics')).content.decode())
+        self.assertEqual(data['chores:chore_list']['requests'], 1)
+        detail = data['chores:chore_detail']
+        self.assertEqual(detail['requests'], 2)
+        self.assertEqual(detail['sql_queries']['p50'], 2)
+        self.assertEqual(detail['sql_queries']['sum'], 4)
+        self.assertGreater(detail['wall_seconds']['p99'], 0)
+        self.assertGreater(detail['sql_seconds']['sum'], 0)
+
+    def test_prometheus_metrics(self):
+        self.client.get(reverse('chores:task_list'))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('chores:metrics'), {'format': 'prometheus'})
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertContains(response, 'chores_requests_total{view="chores:task_list"} 1')
+        self.assertContains(response, 'chores_request_sql_queries{view="chores:task_list",quantile="0.99"}')
+        self.assertContains(response, '# TYPE chores_request_wall_seconds summary')
@@ -0,0 +1,69 @@
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from chores.models import *
+from chores.routers import PIN_COOKIE
+from chores.tests.utilities import *
+
+
+# The test settings give the primary (default) and the replica databases of their
+# own, so a page shows replica-only rows exactly when it read from the replica.
+@override_settings(CHORES_REPLICAS=['replica'])
+class ReplicaViewTests(FactoryTestCase):
+    multi_db = True
+    populate = "populate_children"
+
+    def setUp(self):
+        self.twin = Child.objects.using('replica').create(first_name="Replica", last_name="Only")
+
+    def test_list_reads_replica(self):
+        with CaptureQueriesContext(connections['default']) as primary:
+            response = self.client.get(reverse('chores:child_list'))
+        self.assertContains(response, "Replica Only")
+        self.assertNotContains(response, "Alex Heimann")
+        self.assertEqual(len(primary), 0)
+
+    def test_detail_reads_replica(self):
+        response = self.client.get(reverse('chores:child_detail', args=(self.twin.id,)))
+        self.assertContains(response, "Replica Only")
+
+    def test_write_goes_to_primary_and_pins_reads(self):
+        response = self.client.post(reverse('chores:child_new'),
+            {'first_name': 'Connor', 'last_name': 'Hanley', 'active': True})
+        self.assertTrue(Child.objects.using('default').filter(first_name='Connor').exists())
+        self.assertFalse(Child.objects.using('replica').filter(first_name='Connor').exists())
+        self.assertIn(PIN_COOKIE, response.cookies)
+        # The redirect lands on a page the replica does not have yet
+        detail = self.client.get(response['Location'])
+        self.assertContains(detail, "Connor Hanley")
+        self.assertContains(self.client.get(reverse('chores:child_list')), "Alex Heimann")
+
+    def test_replica_reads_leave_the_shared_caches_alone(self):
+        pages = [reverse('chores:child_list'), reverse('chores:child_leaderboard') + '?period=all']
+        for page in pages:
+            self.assertContains(self.client.get(page), "Replica Only")
+        # A client reading the primary must not be served what the replica returned
+        self.client.cookies[PIN_COOKIE] = '1'
+        for page in pages:
+            response = self.client.get(page)
+            self.assertContains(response, "Alex Heimann")
+            self.assertNotContains(response, "Replica Only")
+
+    def test_instances_read_from_replica_save_to_primary(self):
+        twin = Child.objects.using('replica').get(pk=self.twin.pk)
+        twin.first_name = "Moved"
+        twin.save()
+        self.assertTrue(Child.objects.using('default').filter(first_name="Moved").exists())
+
+    def test_forms_read_primary(self):
+        response = self.client.get(reverse('chores:child_edit', args=(self.factories.alex.id,)))
+        self.assertContains(response, 'value="Alex"')
+
+    @override_settings(CHORES_REPLICAS=[])
+    def test_without_replicas(self):
+        response = self.client.post(reverse('chores:child_new'),
+            {'first_name': 'Connor', 'last_name': 'Hanley', 'active': True})
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertNotContains(self.client.get(reverse('chores:child_list')), "Replica Only")
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ChoreTracker.settings import postgres_database
+from chores.middleware import StatementTimeoutMiddleware
+
+
+# PostgreSQL is not available to every test run, so these check the statements the
+# middleware issues rather than a cancelled query.
+class StatementTimeoutTests(SimpleTestCase):
+
+    def postgres_connection(self):
+        postgres = mock.MagicMock(vendor='postgresql')
+        cursor = postgres.cursor.return_value.__enter__.return_value
+        return postgres, cursor
+
+    @override_settings(CHORES_STATEMENT_TIMEOUT=250)
+    def test_sets_timeout_on_new_postgres_connections(self):
+        middleware = StatementTimeoutMiddleware(lambda request: None)
+        postgres, cursor = self.postgres_connection()
+        middleware.set_timeout(type(postgres), postgres)
+        cursor.execute.assert_called_once_with("SET statement_timeout = %s", [250])
+
+    def test_leaves_other_databases_alone(self):
+        middleware = StatementTimeoutMiddleware(lambda request: None)
+        sqlite = mock.Mock(vendor='sqlite')
+        middleware.set_timeout(type(sqlite), sqlite)
+        sqlite.cursor.assert_not_called()
+
+    @override_settings(CHORES_STATEMENT_TIMEOUT=0)
+    def test_zero_turns_timeout_off(self):
+        with mock.patch('chores.middleware.connection_created') as signal:
+            StatementTimeoutMiddleware(lambda request: None)
+        signal.connect.assert_not_called()
+
+    def test_postgres_settings_have_no_timeout(self):
+        # Migrations and management commands connect with these settings alone
+        self.assertNotIn('options', postgres_database('localhost').get('OPTIONS', {}))
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -9,9 +11,7 @@ from chores.tests.utilities import *
 
 
 class TaskViewTests(FactoryTestCase):
-
-    def setUp(self):
-        self.factories.populate_tasks()
+    populate = "populate_tasks"
 
     def test_list_view_with_no_tasks(self):
         Task.objects.all().delete()
@@ -28,6 +28,29 @@ class TaskViewTests(FactoryTestCase):
         self.assertQuerysetEqual(list(response.context['tasks']), 
             [repr(self.factories.mow), repr(self.factories.shovel), repr(self.factories.wood), repr(self.factories.sweep), repr(self.factories.dishes)])
 
+    def test_list_view_pages(self):
+        response = self.client.get(reverse('chores:task_list'), {'per_page': 4})
+        self.assertEqual(len(response.context['tasks']), 4)
+        response = self.client.get(reverse('chores:task_list') + '?' + response.context['page'].next_query)
+        self.assertEqual(list(response.context['tasks']), [self.factories.dishes])
+
+    def test_search_view(self):
+        response = self.client.get(reverse('chores:task_search'), {'q': 's'})
+        self.assertEqual(response.status_code, 200)
+        # Stack wood is inactive
+        self.assertEqual(response.json(), {'results': [
+            {'id': self.factories.shovel.id, 'text': "Shovel driveway"},
+            {'id': self.factories.sweep.id, 'text': "Sweep floor"},
+        ]})
+
+    def test_search_view_tells_same_names_apart(self):
+        twin = TaskFactory.create(name="Sweep floor")
+        response = self.client.get(reverse('chores:task_search'), {'q': 'sw'})
+        self.assertEqual(response.json(), {'results': [
+            {'id': self.factories.sweep.id, 'text': "Sweep floor (#%d)" % self.factories.sweep.id},
+            {'id': twin.id, 'text': "Sweep floor (#%d)" % twin.id},
+        ]})
+
     def test_new_task_view(self):
         response = self.client.get(reverse('chores:task_new'))
         self.assertEqual(response.status_code, 200)
@@ -39,7 +62,7 @@ class TaskViewTests(FactoryTestCase):
         response = self.client.post(reverse('chores:task_new'),
             {'name': 'Pet the cat', 'points': 5, 'active': True}) 
         self.assertEqual(Task.objects.count(), num_tasks + 1)
-        self.assertRedirects(response, reverse('chores:task_detail', args=(num_tasks+1,)))
+        self.assertRedirects(response, reverse('chores:task_detail', args=(Task.objects.latest('pk').pk,)))
 
     def test_create_bad_task_view(self):
         num_tasks = Task.objects.count()
@@ -76,3 +99,42 @@ class TaskViewTests(FactoryTestCase):
         self.assertEqual(Task.objects.count(), num_tasks - 1)
         self.assertRedirects(response, reverse('chores:task_list'))
 
+
+
+class TaskUsageTests(FactoryTestCase):
+    populate = "populate_chores"
+
+    def test_detail_view_usage(self):
+        ChoreFactory.create(child=self.factories.mark, task=self.factories.dishes, due_on=timezone.localdate() - timezone.timedelta(days=1))
+        response = self.client.get(reverse('chores:task_detail', args=(self.factories.dishes.id,)))
+        usage = response.context['usage']
+        self.assertEqual((usage['assigned'], usage['completed'], usage['overdue']), (4, 1, 1))
+        self.assertEqual((usage['completion_rate'], usage['overdue_rate']), (25.0, 25.0))
+        self.assertEqual(usage['top_children'], [{'id': self.factories.alex.id, 'name': "Alex Heimann", 'completed': 1}])
+        self.assertContains(response, "(25%)", count=2)
+
+    def test_detail_view_usage_is_cached(self):
+        url = reverse('chores:task_detail', args=(self.factories.dishes.id,))
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(url)
+        self.assertFalse([query for query in captured if 'chores_chore' in query['sql']])
+
+    def test_detail_view_usage_follows_chores(self):
+        dishes, sweep = self.factories.dishes, self.factories.sweep
+        url = reverse('chores:task_detail', args=(dishes.id,))
+        response = self.client.get(url)
+        self.client.get(reverse('chores:task_detail', args=(sweep.id,)))
+        Chore.objects.filter(pk=self.factories.mc2.pk).set_completed(True)
+        self.assertEqual(self.client.get(url).context['usage']['completed'], 2)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        chore = self.factories.mc1
+        chore.task = dishes
+        chore.save()
+        self.assertEqual(self.client.get(url).context['usage']['assigned'], 4)
+        self.assertEqual(self.client.get(reverse('chores:task_detail', args=(sweep.id,))).context['usage']['assigned'], 2)
+        self.factories.mark.first_name = "Marcus"
+        self.factories.mark.save()
+        self.assertContains(self.client.get(url), "Marcus Heimann")
+        Chore.objects.filter(task=dishes).delete()
+        self.assertContains(self.client.get(url), "Nobody has completed this task yet.")
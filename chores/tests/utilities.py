@@ -1,4 +1,7 @@
+import copy
+
 from chores.tests.factories import *
+from django.core.cache import cache
 from django.utils import timezone
 from django.test import TestCase
 
@@ -30,4 +33,21 @@ class Populate():
 
 
 class FactoryTestCase(TestCase):
-    factories = Populate()
\ No newline at end of file
+    # The Populate method (e.g. "populate_chores") whose rows every test in the class starts from.
+    # They are created once per class in setUpTestData and rolled back to after each test.
+    populate = None
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fixture_data = Populate()
+        if cls.populate:
+            getattr(cls.fixture_data, cls.populate)()
+
+    # The cache outlives each test's rolled back transaction, so start every test with it empty.
+    # Each test also gets its own copy of the fixture instances, so changing one in memory
+    # cannot leak into the next test.
+    def _pre_setup(self):
+        super()._pre_setup()
+        cache.clear()
+        self.factories = copy.deepcopy(self.fixture_data)
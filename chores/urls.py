@@ -4,20 +4,31 @@ from chores import views
 
 urlpatterns = [
     url(r'^children$', views.ChildList.as_view(), name='child_list'),
+    url(r'^children/leaderboard$', views.ChildLeaderboard.as_view(), name='child_leaderboard'),
+    url(r'^children/search$', views.ChildSearch.as_view(), name='child_search'),
     url(r'^children/(?P<pk>\d+)$', views.ChildDetail.as_view(), name='child_detail'),
     url(r'^children/new$', views.ChildCreate.as_view(), name='child_new'),
     url(r'^children/edit/(?P<pk>\d+)$', views.ChildUpdate.as_view(), name='child_edit'),
     url(r'^children/delete/(?P<pk>\d+)$', views.ChildDelete.as_view(), name='child_delete'),
 
     url(r'^tasks$', views.TaskList.as_view(), name='task_list'),
+    url(r'^tasks/search$', views.TaskSearch.as_view(), name='task_search'),
     url(r'^tasks/(?P<pk>\d+)$', views.TaskDetail.as_view(), name='task_detail'),
     url(r'^tasks/new$', views.TaskCreate.as_view(), name='task_new'),
     url(r'^tasks/edit/(?P<pk>\d+)$', views.TaskUpdate.as_view(), name='task_edit'),
     url(r'^tasks/delete/(?P<pk>\d+)$', views.TaskDelete.as_view(), name='task_delete'),
 
+    url(r'^_metrics$', views.MetricsView.as_view(), name='metrics'),
+
     url(r'^$', views.ChoreList.as_view(), name='chore_list'),
     url(r'^(?P<pk>\d+)$', views.ChoreDetail.as_view(), name='chore_detail'),
     url(r'^new$', views.ChoreCreate.as_view(), name='chore_new'),
+    url(r'^new/bulk$', views.ChoreBulkCreate.as_view(), name='chore_bulk_new'),
+    url(r'^bulk$', views.ChoreBulkUpdate.as_view(), name='chore_bulk_update'),
+    url(r'^agenda$', views.ChoreAgenda.as_view(), name='chore_agenda'),
+    url(r'^export$', views.ChoreExport.as_view(), name='chore_export'),
+    url(r'^import$', views.ChoreImport.as_view(), name='chore_import'),
+    url(r'^archive$', views.ArchivedChoreList.as_view(), name='archived_chore_list'),
     url(r'^edit/(?P<pk>\d+)$', views.ChoreUpdate.as_view(), name='chore_edit'),
     url(r'^delete/(?P<pk>\d+)$', views.ChoreDelete.as_view(), name='chore_delete'),
 ]
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from chores import caching
+from chores.models import Chore, task_chores
+
+# Task usage statistics
+#
+# How often a task was assigned, completed and left overdue, and which
+# children complete it most, from two aggregate queries over the task's
+# chores in chore_task_completed_idx. The result is cached under the task's
+# own "task_chores" version, which every write to a chore of the task bumps,
+# so a popular task's page reads the chore table once per change rather than
+# once per request. The "child" version covers the children's names, and the
+# key includes today's date since chores become overdue as days pass.
+# Archived chores are left out: these describe the task's live schedule.
+
+def _key(task):
+    return 'chores:usage:%s:%s:%s' % (task.pk, timezone.localdate(), caching.versions('child', *task_chores(task.pk)))
+
+
+def _rate(count, total):
+    return 100.0 * count / total if total else 0.0
+
+
+def task_usage(task, limit=None):
+    """Assigned, completed and overdue counts and rates of a task, and its top children as dicts of id, name and completed."""
+    limit = limit or getattr(settings, 'CHORES_TASK_TOP_CHILDREN', 5)
+    key = _key(task)
+    usage = cache.get(key)
+    if usage is None:
+        chores = Chore.objects.filter(task=task)
+        usage = chores.stats()
+        usage['assigned'] = usage['pending'] + usage['completed']
+        usage['completion_rate'] = _rate(usage['completed'], usage['assigned'])
+        usage['overdue_rate'] = _rate(usage['overdue'], usage['assigned'])
+        rows = (chores.filter(completed=True).values_list('child_id', 'child__first_name', 'child__last_name')
+            .annotate(completed=Count('pk')).order_by('-completed', 'child_id')[:limit])
+        usage['top_children'] = [{'id': id, 'name': first_name + " " + last_name, 'completed': completed}
+            for id, first_name, last_name, completed in rows]
+        caching.fill(key, usage)
+    return usage
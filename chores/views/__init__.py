@@ -1,3 +1,4 @@
 from .child_views import *
 from .chore_views import *
-from .task_views import *
\ No newline at end of file
+from .task_views import *
+from .metrics_views import *
@@ -1,28 +1,78 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import View
 from django.contrib import messages
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse
+from django.utils import timezone
 
 from chores.models import *
 from chores.forms import *
+from chores.pagination import paginate
+from chores import caching
+from chores.conditional import cached_table_state, conditional, row_state
+from chores.routers import replica_reads
+from chores.autocomplete import search_response
+from chores import leaderboard
 
 # Child Views
 
+# The list shows each child's points, which move with the ledger, including when archived chores are deleted
+CHILD_LIST_VERSIONS = ('child', 'chore', 'task', 'points', 'archive')
+
 class ChildList(View):
+    @replica_reads
+    @conditional(lambda request: cached_table_state('child_list', CHILD_LIST_VERSIONS, Child.objects.all()))
     def get(self, request):
         template = 'children/child_list.html'
+        page = paginate(request, Child.objects.alphabetical(), ("last_name", "first_name", "id"))
         context = {
-            'children': Child.objects.alphabetical()
+            'children': page,
+            'page': page,
+            'cache_version': caching.versions(*CHILD_LIST_VERSIONS)
         }
         return render(request, template, context)
 
+class ChildSearch(View):
+    def get(self, request):
+        return search_response(request, Child.objects.active().alphabetical(), ('first_name', 'last_name'),
+            lambda first_name, last_name: first_name + " " + last_name)
+
+class ChildLeaderboard(View):
+    @replica_reads
+    def get(self, request):
+        template = 'children/child_leaderboard.html'
+        period = request.GET.get('period', 'week')
+        if period not in dict(leaderboard.PERIODS):
+            raise Http404("No such leaderboard.")
+        child = None
+        if request.GET.get('child', '').isdigit():
+            child = get_object_or_404(Child, pk=request.GET['child'])
+        context = {
+            'periods': leaderboard.PERIODS,
+            'period': period,
+            'board': leaderboard.top(period),
+            'child': child,
+            'child_rank': leaderboard.rank_of(child, period) if child else None,
+        }
+        return render(request, template, context)
+
+def child_detail_state(request, pk):
+    state = row_state(Child.objects.filter(pk=pk), 'updated_at')
+    # The statistics follow the child's chores, and which of them are overdue follows the date
+    return state and list(state) + [caching.versions('chore', 'task'), timezone.localdate()]
+
 class ChildDetail(View):
+    @replica_reads
+    @conditional(child_detail_state)
     def get(self, request, pk):
         template = 'children/child_detail.html'
         child = get_object_or_404(Child, pk=pk)
+        limit = getattr(settings, 'CHORES_RECENT_CHORES', 10)
         context = {
-            'child': child
+            'child': child,
+            'stats': child.chore_set.stats(),
+            'recent_chores': child.chore_set.recent().select_related('task')[:limit],
         }
         return render(request, template, context)
 
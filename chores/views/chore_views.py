@@ -1,26 +1,117 @@
+import io
+
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import View
 from django.contrib import messages
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseBadRequest, HttpResponseRedirect, StreamingHttpResponse
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import is_safe_url
 
 from chores.models import *
 from chores.forms import *
+from chores.pagination import paginate
+from chores import caching
+from chores.conditional import cached_table_state, conditional, row_state
+from chores.routers import replica_reads
+from chores import export
+from chores import importer
+from chores.agenda import Agenda
 
 # Chore Views
 
+def chore_table_state():
+    return cached_table_state('chore_list', ('chore', 'child', 'task'),
+        Chore.objects.all(), Child.objects.all(), Task.objects.all())
+
 class ChoreList(View):
+    @replica_reads
+    @conditional(lambda request: chore_table_state())
     def get(self, request):
         template = 'chores/chore_list.html'
+        page = paginate(request, Chore.objects.chronological(), ("due_on", "task_name", "id"))
+        context = {
+            'chores': page,
+            'page': page,
+            'cache_version': caching.versions("chore", "child", "task")
+        }
+        return render(request, template, context)
+
+class ChoreAgenda(View):
+    @replica_reads
+    # Without ?start= the agenda shows the current week or month, so the state includes today
+    @conditional(lambda request: chore_table_state() + [timezone.localdate()])
+    def get(self, request):
+        template = 'chores/chore_agenda.html'
+        form = ChoreAgendaForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text(), content_type='text/plain')
+        context = {
+            'agenda': Agenda(Chore.objects.all(), form.cleaned_data['span'] or 'week', form.cleaned_data['start']),
+            'cache_version': caching.versions("chore", "child", "task")
+        }
+        return render(request, template, context)
+
+class ArchivedChoreList(View):
+    @replica_reads
+    def get(self, request):
+        template = 'chores/archived_chore_list.html'
+        page = paginate(request, ArchivedChore.objects.chronological(), ("due_on", "id"))
         context = {
-            'chores': Chore.objects.chronological()
+            'chores': page,
+            'page': page,
+            'cache_version': caching.versions("archive", "child", "task")
         }
         return render(request, template, context)
 
+class ChoreExport(View):
+    def get(self, request):
+        form = ChoreExportForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text(), content_type='text/plain')
+        file_format = form.cleaned_data['format'] or 'csv'
+        encode, content_type = export.FORMATS[file_format]
+        response = StreamingHttpResponse(encode(export.rows(form.queryset())), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="chores.%s"' % file_format
+        return response
+
+class ChoreImport(View):
+    def get(self, request):
+        template = 'chores/chore_import.html'
+        context = {
+            'form': ChoreImportForm()
+        }
+        return render(request, template, context)
+
+    def post(self, request):
+        template = 'chores/chore_import.html'
+        form = ChoreImportForm(request.POST, request.FILES)
+        context = {
+            'form': form
+        }
+        if not form.is_valid():
+            return render(request, template, context)
+        # Decoded as it is read, so the upload is never held in memory as text
+        lines = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+        try:
+            result = importer.read(lines)
+        except (importer.InvalidFile, UnicodeDecodeError) as error:
+            form.add_error('file', str(error))
+            return render(request, template, context)
+        message = 'Successfully imported %d chores (%d already existed)!' % (result.created, result.skipped)
+        if result.failed:
+            messages.warning(request, message)
+            context['result'] = result
+            return render(request, template, context)
+        messages.success(request, message)
+        return HttpResponseRedirect(reverse('chores:chore_list'))
+
 class ChoreDetail(View):
+    @replica_reads
+    @conditional(lambda request, pk: row_state(Chore.objects.filter(pk=pk), 'updated_at', 'child__updated_at', 'task__updated_at'))
     def get(self, request, pk):
         template = 'chores/chore_detail.html'
-        chore = get_object_or_404(Chore, pk=pk)
+        chore = get_object_or_404(Chore.objects.with_related(), pk=pk)
         context = {
             'chore': chore
         }
@@ -48,6 +139,42 @@ class ChoreCreate(View):
             }
             return render(request, template, context)
 
+class ChoreBulkCreate(View):
+    def get(self, request):
+        template = 'chores/chore_bulk_form.html'
+        form = ChoreBulkForm()
+        context = {
+            'form': form
+        }
+        return render(request, template, context)
+
+    def post(self, request):
+        form = ChoreBulkForm(request.POST)
+        if form.is_valid():
+            created, skipped = form.save()
+            messages.success(request, 'Successfully created %d chores (%d already existed)!' % (created, skipped))
+            return HttpResponseRedirect(reverse('chores:chore_list'))
+        else:
+            template = 'chores/chore_bulk_form.html'
+            context = {
+                'form': form
+            }
+            return render(request, template, context)
+
+class ChoreBulkUpdate(View):
+    def post(self, request):
+        form = ChoreBulkActionForm(request.POST)
+        if form.is_valid():
+            changed, selected = form.save()
+            status = 'completed' if form.cleaned_data['action'] == 'complete' else 'pending'
+            messages.success(request, 'Successfully marked %d chores %s (%d already were)!' % (changed, status, selected - changed))
+        else:
+            messages.error(request, 'Select at least one chore and an action.')
+        next_url = request.POST.get('next')
+        if not is_safe_url(next_url, host=request.get_host()):
+            next_url = reverse('chores:chore_list')
+        return HttpResponseRedirect(next_url)
+
 class ChoreUpdate(View):
     def get(self, request, pk):
         template = 'chores/chore_form.html'
@@ -0,0 +1,16 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.generic import View
+
+from chores import metrics
+
+# Metrics Views
+
+class MetricsView(View):
+    @method_decorator(staff_member_required)
+    def get(self, request):
+        snapshot = metrics.registry.snapshot()
+        if request.GET.get('format') == 'prometheus' or 'text/plain' in request.META.get('HTTP_ACCEPT', ''):
+            return HttpResponse(metrics.prometheus(snapshot), content_type='text/plain; version=0.0.4')
+        return JsonResponse(snapshot)
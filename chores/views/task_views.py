@@ -3,26 +3,50 @@ from django.views.generic import View
 from django.contrib import messages
 from django.http import HttpResponseRedirect
 from django.urls import reverse
+from django.utils import timezone
 
 from chores.models import *
 from chores.forms import *
+from chores.pagination import paginate
+from chores import caching
+from chores.conditional import cached_table_state, conditional, row_state
+from chores.routers import replica_reads
+from chores.autocomplete import search_response
+from chores.usage import task_usage
 
 # Task Views
 
 class TaskList(View):
+    @replica_reads
+    @conditional(lambda request: cached_table_state('task_list', ('task',), Task.objects.all()))
     def get(self, request):
         template = 'tasks/task_list.html'
+        page = paginate(request, Task.objects.alphabetical(), ("name", "id"))
         context = {
-            'tasks': Task.objects.alphabetical()
+            'tasks': page,
+            'page': page,
+            'cache_version': caching.versions("task")
         }
         return render(request, template, context)
 
+class TaskSearch(View):
+    def get(self, request):
+        return search_response(request, Task.objects.active().alphabetical(), ('name',), lambda name: name)
+
+def task_detail_state(request, pk):
+    state = row_state(Task.objects.filter(pk=pk), 'updated_at')
+    # The usage statistics follow the task's chores and the children's names, and overdue ones the date
+    return state and list(state) + [caching.versions('child', *task_chores(int(pk))), timezone.localdate()]
+
 class TaskDetail(View):
+    @replica_reads
+    @conditional(task_detail_state)
     def get(self, request, pk):
         template = 'tasks/task_detail.html'
         task = get_object_or_404(Task, pk=pk)
         context = {
-            'task': task
+            'task': task,
+            'usage': task_usage(task),
         }
         return render(request, template, context)
 
@@ -0,0 +1,84 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+# Form widgets
+
+
+class AutocompleteInput(forms.TextInput):
+    """Picks one row of a ModelChoiceField by searching it as you type.
+
+    The form submits the row's id from a hidden input, so the field still
+    validates exactly the submitted id against its queryset, but unlike a
+    Select the page never lists the table: a text box asks the JSON search
+    endpoint at url_name for matches and offers them in a <datalist>.
+    """
+    template_name = 'chores/widgets/autocomplete.html'
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    # Point labels at the text box, the hidden input cannot take focus
+    def id_for_label(self, id_):
+        return id_ + '_search' if id_ else id_
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['url'] = reverse(self.url_name)
+        context['widget']['label'] = self.label_for(value)
+        return context
+
+    # The text shown for the selected id; a single-row lookup, and only when a value is set
+    def label_for(self, value):
+        if value in self.choices.field.empty_values:
+            return ''
+        try:
+            instance = self.choices.queryset.filter(pk=value).first()
+        except (ValueError, TypeError, ValidationError):
+            return ''
+        return self.choices.field.label_from_instance(instance) if instance else ''
+
+
+class AutocompleteMultipleInput(AutocompleteInput):
+    """Picks any number of rows of a ModelMultipleChoiceField the same way.
+
+    Each picked row is listed with a hidden input of its id, all under the
+    field's name, and can be removed again; the text box only adds rows.
+    """
+    template_name = 'chores/widgets/autocomplete_multiple.html'
+    allow_multiple_selected = True
+
+    def value_from_datadict(self, data, files, name):
+        try:
+            getter = data.getlist
+        except AttributeError:
+            getter = data.get
+        return getter(name)
+
+    def value_omitted_from_data(self, data, files, name):
+        # Removing every row submits nothing, which means none, like a SelectMultiple
+        return False
+
+    def format_value(self, value):
+        if value is None:
+            return []
+        if not isinstance(value, (tuple, list)):
+            value = [value]
+        return [str(v) for v in value if v not in self.choices.field.empty_values]
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['selected'] = context['widget'].pop('label')
+        return context
+
+    # (id, text) of every selected row, in the order submitted; one lookup for all of them
+    def label_for(self, value):
+        ids = self.format_value(value)
+        if not ids:
+            return []
+        try:
+            instances = {str(instance.pk): instance for instance in self.choices.queryset.filter(pk__in=ids)}
+        except (ValueError, TypeError, ValidationError):
+            return []
+        return [(pk, self.choices.field.label_from_instance(instances[pk])) for pk in ids if pk in instances]